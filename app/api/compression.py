@@ -0,0 +1,196 @@
+"""
+Response compression (gzip / brotli)
+CompressionMiddleware negotiates Accept-Encoding for JSON, GeoJSON, CSV
+and NDJSON responses. An encoded response gets its own ETag
+("<etag>-gzip" / "<etag>-br") and every compressible response carries
+Vary: Accept-Encoding.
+
+Responses whose ETag is the catalog ETag of their request (see
+conditional.catalog_etag) and whose size is known and at most
+PRECOMPRESS_MAX_BYTES are compressed once and kept in an LRU keyed by
+(ETag, encoding, Accept).
+Catalog ETags embed the data version, so the next request for the same
+URL is answered from that cache before the endpoint runs, and a write
+makes the old entries unreachable. Streamed and larger responses are
+compressed on the fly; the full-catalog GeoJSON artifact has precompressed
+files of its own (see export_cache).
+
+Cached responses skip every layer inside this middleware, so it must sit
+inside anything that varies per request (CORS): see app/main.py.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+
+from app.api.conditional import catalog_etag
+from app.services.content_coding import (
+    StreamCompressor,
+    choose_encoding,
+    compress,
+    encoded_etag,
+)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/geo+json", "text/csv", "application/x-ndjson")
+COMPRESSION_MIN_BYTES = 1024
+PRECOMPRESS_MAX_BYTES = int(os.getenv("PRECOMPRESS_MAX_BYTES", str(16 * 1024 * 1024)))
+PRECOMPRESSED_CACHE_MAX_BYTES = int(os.getenv("PRECOMPRESSED_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+
+_cache_lock = threading.Lock()
+_cache: "OrderedDict[tuple, Tuple[List[Tuple[bytes, bytes]], bytes]]" = OrderedDict()
+_cache_bytes = 0
+
+
+def _cache_get(key: tuple):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+        return entry
+
+
+def _cache_put(key: tuple, headers: List[Tuple[bytes, bytes]], body: bytes) -> None:
+    global _cache_bytes
+    if len(body) > PRECOMPRESSED_CACHE_MAX_BYTES // 4:
+        return
+    with _cache_lock:
+        if key in _cache:
+            return
+        _cache[key] = (list(headers), body)
+        _cache_bytes += len(body)
+        while _cache_bytes > PRECOMPRESSED_CACHE_MAX_BYTES:
+            _, (_, evicted) = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+
+
+def get_compression_cache_status() -> Dict[str, int]:
+    """
+    Returns: {"entries", "bytes", "max_bytes"} of the precompressed response cache
+    """
+    with _cache_lock:
+        return {"entries": len(_cache), "bytes": _cache_bytes, "max_bytes": PRECOMPRESSED_CACHE_MAX_BYTES}
+
+
+def _is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        # Byte ranges are served from the identity representation
+        encoding = None if "range" in request_headers else choose_encoding(request_headers.get("accept-encoding"))
+        accept = request_headers.get("accept", "")
+
+        revalidating = "if-none-match" in request_headers or "if-modified-since" in request_headers
+        etag = catalog_etag(Request(scope)) if encoding else None
+        if encoding and not revalidating:
+            cached = _cache_get((etag, encoding, accept))
+            if cached is not None:
+                headers, body = cached
+                # A copy: outer middleware (CORS) adds its headers in place
+                await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        responder = _CompressionResponder(send, encoding, accept, request_headers.get("if-none-match", ""), etag)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: Optional[str], accept: str, if_none_match: str, catalog_etag: Optional[str]):
+        self._send = send
+        self.encoding = encoding
+        self.accept = accept
+        self.if_none_match = if_none_match
+        # Only a response carrying this ETag is what the cache lookup for
+        # the request expects; others (/all as NDJSON, ...) are not cached
+        self.catalog_etag = catalog_etag
+        self.mode = "passthrough"  # "buffer": compress and cache, "stream": compress per chunk
+        self.start = None
+        self.body: List[bytes] = []
+        self.compressor: Optional[StreamCompressor] = None
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            await self._on_start(message)
+        elif message["type"] == "http.response.body" and self.mode != "passthrough":
+            await self._on_body(message)
+        else:
+            await self._send(message)
+
+    async def _on_start(self, message):
+        headers = MutableHeaders(raw=message["headers"])
+        etag = headers.get("etag")
+
+        if message["status"] == 304:
+            # Revalidating an encoded copy: answer with the ETag it was sent with
+            if self.encoding and etag and encoded_etag(etag, self.encoding) in self.if_none_match:
+                headers["ETag"] = encoded_etag(etag, self.encoding)
+                headers.add_vary_header("Accept-Encoding")
+            await self._send(message)
+            return
+
+        if not _is_compressible(headers):
+            await self._send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        length = headers.get("content-length")
+        if (
+            self.encoding is None
+            or message["status"] != 200
+            or "content-encoding" in headers
+            or "content-range" in headers
+            or (length is not None and int(length) < COMPRESSION_MIN_BYTES)
+        ):
+            await self._send(message)
+            return
+
+        if etag:
+            headers["ETag"] = encoded_etag(etag, self.encoding)
+        headers["Content-Encoding"] = self.encoding
+        self.start = message
+
+        if etag == self.catalog_etag and length is not None and int(length) <= PRECOMPRESS_MAX_BYTES:
+            self.mode = "buffer"
+            return
+
+        self.mode = "stream"
+        if length is not None:
+            del headers["Content-Length"]
+        self.compressor = StreamCompressor(self.encoding)
+        await self._send(message)
+
+    async def _on_body(self, message):
+        data = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.mode == "stream":
+            chunk = self.compressor.chunk(data) if data else b""
+            if not more_body:
+                chunk += self.compressor.finish()
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        self.body.append(data)
+        if more_body:
+            return
+        body = compress(b"".join(self.body), self.encoding)
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Length"] = str(len(body))
+        _cache_put((self.catalog_etag, self.encoding, self.accept), self.start["headers"], body)
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": body})
@@ -0,0 +1,93 @@
+"""
+Conditional GET support for catalog read endpoints
+ETag and Last-Modified are derived from the catalog data version and the
+request URL only, so a client whose copy is current gets 304 Not Modified
+before any query runs.
+"""
+
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+from fastapi import HTTPException, Request, Response
+from app.services.content_coding import strip_etag_suffix
+from app.services.data_version import get_data_version, get_last_modified
+
+
+def catalog_etag(request: Request) -> str:
+    """
+    Strong ETag for this URL at the current data version
+    Query parameters are sorted so equivalent URLs share one ETag
+    """
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{request.url.path}?{query}".encode("utf-8")).hexdigest()[:16]
+    return f'"{get_data_version()}-{digest}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/ prefixes are ignored, and so
+    # are the -gzip / -br suffixes of compressed representations
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if strip_etag_suffix(candidate) == etag:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return get_last_modified().replace(microsecond=0) <= since
+    return False
+
+
+def representation_etag(etag: str, representation: str) -> str:
+    """
+    ETag of an alternative body for the same URL: '"v-hash"' -> '"v-hash-<representation>"'
+    """
+    return f'{etag[:-1]}-{representation}"'
+
+
+def conditional_headers(request: Request, representation: Optional[str] = None) -> Dict[str, str]:
+    """
+    Validators for this URL, raising 304 when the client's copy is current
+    representation names an alternative body served at the same URL (e.g.
+    "ndjson" chosen by Accept): its ETag gets a "-<representation>" suffix so
+    it never validates a copy of the default body
+    """
+    etag = catalog_etag(request)
+    if representation:
+        etag = representation_etag(etag, representation)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(get_last_modified(), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if is_not_modified(request, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    return headers
+
+
+def conditional_get(request: Request, response: Response) -> Dict[str, str]:
+    """
+    Dependency for read endpoints
+    Raises 304 when the client's copy is current, otherwise sets the
+    validators on the response and returns them (for endpoints that build
+    their own Response object)
+    """
+    headers = conditional_headers(request)
+    response.headers.update(headers)
+    return headers
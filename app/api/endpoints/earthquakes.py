@@ -1,23 +1,146 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-import io
-import zipfile
-import json
-from app.db.database import get_db
-from app.services.earthquake_service import EarthquakeService
+from typing import Any, Dict, List, Optional
+import asyncio
+import orjson
+from app.db.database import get_db, get_async_db
+from app.db.routing import get_read_db, get_async_read_db, read_session_factory
+from app.api.conditional import conditional_get, conditional_headers, representation_etag
+from app.api.ranges import ranged_file_response
+from app.services.earthquake_service import (
+    EarthquakeService,
+    parse_float,
+    parse_fields,
+    filter_signature,
+    RESPONSE_COLUMNS,
+    COORDINATE_COLUMNS,
+    TIME_BUCKETS,
+)
+from app.services.async_earthquake_service import AsyncEarthquakeService
+from app.services.export_service import ROW_JSON_OPTIONS, iter_geojson, iter_ndjson, iter_shapefile_zip
+from app.services.export_cache import ARTIFACTS, get_artifact, schedule_refresh
+from app.services.content_coding import choose_encoding, encoded_etag
+from app.services.tabular_export import iter_csv, iter_parquet, iter_arrow_stream
+from app.services.export_jobs import EXPORT_FORMATS, start_export_job, get_export_job, get_export_file
+from app.services.analytics_service import AnalyticsService, DEFAULT_BIN_WIDTH, DEFAULT_MC_CORRECTION, TIME_WINDOWS
+from app.services.tile_service import TileService, MAX_ZOOM
+from app.services.heatmap_service import HeatmapService, PRECOMPUTED_CELL_SIZES, refresh_precomputed
 from app.services.api_service import ApiService
-from app.schemas.earthquake import Earthquake, EarthquakeCreate, EarthquakeUpdate, EarthquakeResponse
+from app.schemas.earthquake import (
+    Earthquake,
+    EarthquakeCreate,
+    EarthquakeUpdate,
+    EarthquakeResponse,
+    EarthquakeNearResponse,
+)
 
 router = APIRouter()
 
+FIELDS_DESCRIPTION = "Comma separated list of columns to return, e.g. id,lat,lon,magnitude"
+
+# Pages at least this large skip ORM hydration and per-row schema
+# validation: plain rows are selected and encoded with orjson
+FAST_PATH_MIN_ROWS = 1000
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class RowsJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse for plain RESPONSE_COLUMNS rows, with datetimes encoded
+    the way the Earthquake response model encodes them
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | ROW_JSON_OPTIONS
+        )
+
+
+def export_filters(
+    epicenter: Optional[str] = Query(None, description="Search term matched against uz/ru/en epicenter names"),
+    epicenter_mode: str = Query("contains", pattern="^(contains|prefix)$"),
+    from_date: Optional[str] = Query(None),
+    to_date: Optional[str] = Query(None),
+    from_magnitude: Optional[str] = Query(None),
+    to_magnitude: Optional[str] = Query(None),
+    from_depth: Optional[str] = Query(None),
+    to_depth: Optional[str] = Query(None),
+    from_latitude: Optional[str] = Query(None),
+    to_latitude: Optional[str] = Query(None),
+    from_longitude: Optional[str] = Query(None),
+    to_longitude: Optional[str] = Query(None),
+    from_year: Optional[int] = Query(None),
+    to_year: Optional[int] = Query(None)
+) -> Dict[str, Any]:
+    """
+    The listing filters of read_earthquakes, for the export endpoints
+    """
+    return dict(
+        epicenter=epicenter,
+        epicenter_mode=epicenter_mode,
+        from_date=from_date,
+        to_date=to_date,
+        from_magnitude=parse_float(from_magnitude),
+        to_magnitude=parse_float(to_magnitude),
+        from_depth=parse_float(from_depth),
+        to_depth=parse_float(to_depth),
+        from_latitude=parse_float(from_latitude),
+        to_latitude=parse_float(to_latitude),
+        from_longitude=parse_float(from_longitude),
+        to_longitude=parse_float(to_longitude),
+        from_year=from_year,
+        to_year=to_year,
+    )
+
+
+def region_filters(
+    from_date: Optional[str] = Query(None),
+    to_date: Optional[str] = Query(None),
+    from_year: Optional[int] = Query(None),
+    to_year: Optional[int] = Query(None),
+    from_depth: Optional[str] = Query(None),
+    to_depth: Optional[str] = Query(None),
+    from_latitude: Optional[str] = Query(None),
+    to_latitude: Optional[str] = Query(None),
+    from_longitude: Optional[str] = Query(None),
+    to_longitude: Optional[str] = Query(None)
+) -> Dict[str, Any]:
+    """
+    Time window and region filters of the analytics and heatmap
+    endpoints, parsed like export_filters
+    """
+    return dict(
+        from_date=from_date,
+        to_date=to_date,
+        from_year=from_year,
+        to_year=to_year,
+        from_depth=parse_float(from_depth),
+        to_depth=parse_float(to_depth),
+        from_latitude=parse_float(from_latitude),
+        to_latitude=parse_float(to_latitude),
+        from_longitude=parse_float(from_longitude),
+        to_longitude=parse_float(to_longitude),
+    )
+
+
+def _fields_param(fields: Optional[str], allowed: Dict) -> Optional[List[str]]:
+    try:
+        return parse_fields(fields, allowed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/", response_model=EarthquakeResponse)
 async def read_earthquakes(
-    db: Session = Depends(get_db),
+    cache_headers: Dict[str, str] = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_read_db),
     skip: int = Query(0, alias="page", ge=0),
     limit: int = Query(10, alias="per_page", ge=1, le=30000),
-    epicenter: Optional[str] = Query(None),
+    epicenter: Optional[str] = Query(None, description="Search term matched against uz/ru/en epicenter names"),
+    epicenter_mode: str = Query("contains", pattern="^(contains|prefix)$"),
     from_date: Optional[str] = Query(None),
     to_date: Optional[str] = Query(None),
     from_magnitude: Optional[str] = Query(None),
@@ -30,73 +153,187 @@ async def read_earthquakes(
     to_longitude: Optional[str] = Query(None),
     from_year: Optional[int] = Query(None),
     to_year: Optional[int] = Query(None),
-    sort: str = Query("datetime_desc")
+    sort: str = Query("datetime_desc", description="datetime_desc, datetime_asc or relevance (with epicenter)"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination cursor. Pass an empty value for the first page, "
+                    "then the next_cursor from the previous response"
+    ),
+    include_total: bool = Query(True, description="Set to false to skip counting the total"),
+    total_mode: str = Query(
+        "exact",
+        pattern="^(exact|estimated)$",
+        description="exact (cached per filter set) or estimated (planner statistics)"
+    ),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
-    # Convert empty/whitespace strings to None and parse magnitude values
-    from_mag = None
-    to_mag = None
-    
-    if from_magnitude and from_magnitude.strip():
-        try:
-            from_mag = float(from_magnitude)
-        except ValueError:
-            pass
+    # Convert empty/whitespace strings to None and parse numeric values
+    from_mag = parse_float(from_magnitude)
+    to_mag = parse_float(to_magnitude)
     
-    if to_magnitude and to_magnitude.strip():
-        try:
-            to_mag = float(to_magnitude)
-        except ValueError:
-            pass
-    
-    earthquakes, total = EarthquakeService.get_earthquakes(
-        db, 
-        skip=skip * limit, 
-        limit=limit,
+    filters = dict(
         epicenter=epicenter,
+        epicenter_mode=epicenter_mode,
         from_date=from_date,
         to_date=to_date,
         from_magnitude=from_mag,
         to_magnitude=to_mag,
-        from_depth=from_depth,
-        to_depth=to_depth,
-        from_latitude=from_latitude,
-        to_latitude=to_latitude,
-        from_longitude=from_longitude,
-        to_longitude=to_longitude,
+        from_depth=parse_float(from_depth),
+        to_depth=parse_float(to_depth),
+        from_latitude=parse_float(from_latitude),
+        to_latitude=parse_float(to_latitude),
+        from_longitude=parse_float(from_longitude),
+        to_longitude=parse_float(to_longitude),
         from_year=from_year,
         to_year=to_year,
-        sort=sort
     )
     
-    last_page = (total + limit - 1) // limit if limit > 0 else 0
+    count_mode = total_mode if include_total else None
+    projection = _fields_param(fields, RESPONSE_COLUMNS)
+    if projection is None and limit >= FAST_PATH_MIN_ROWS:
+        projection = list(RESPONSE_COLUMNS)
     
-    return {
+    next_cursor = None
+    if cursor is not None:
+        # Keyset mode: page is ignored, cost does not grow with depth
+        try:
+            earthquakes, total, total_is_estimate, next_cursor = await AsyncEarthquakeService.get_earthquakes_by_cursor(
+                db, cursor=cursor, limit=limit, sort=sort, count_mode=count_mode,
+                fields=projection, **filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        earthquakes, total, total_is_estimate = await AsyncEarthquakeService.get_earthquakes(
+            db, skip=skip * limit, limit=limit, sort=sort, count_mode=count_mode,
+            fields=projection, **filters
+        )
+    
+    last_page = (total + limit - 1) // limit if total is not None and limit > 0 else None
+    
+    response = {
         "data": earthquakes,
         "total": total,
+        "total_is_estimate": total_is_estimate,
         "page": skip + 1,
         "per_page": limit,
-        "last_page": last_page
+        "last_page": last_page,
+        "next_cursor": next_cursor
     }
+    
+    # Projected rows are plain dicts already in response form (dates are
+    # formatted in SQL), so they bypass the Earthquake response model
+    if projection is not None:
+        return RowsJSONResponse(content=response, headers=cache_headers)
+    return response
 
-@router.get("/all", response_model=List[Earthquake])
-def get_all_earthquakes(db: Session = Depends(get_db)):
+@router.get(
+    "/all",
+    response_model=List[Earthquake],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "JSON array, or one event per line"}}
+)
+def get_all_earthquakes(
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    output_format: Optional[str] = Query(None, alias="format", pattern="^(json|ndjson)$")
+):
     """
     Get all earthquakes without any filters or pagination
     Returns complete list of all earthquakes in the database
+    With format=ndjson (or Accept: application/x-ndjson) the events are
+    streamed as newline-delimited JSON, one per line, as they are read
+    
+    Example: /earthquakes/all?fields=id,lat,lon,magnitude
+             /earthquakes/all?format=ndjson
     """
-    return EarthquakeService.get_all_earthquakes_simple(db)
+    projection = _fields_param(fields, RESPONSE_COLUMNS)
+    ndjson = output_format == "ndjson" or (
+        output_format is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    )
+    # Both bodies are served at the same URL, so they need distinct ETags.
+    # The validators are taken before the session is chosen, as with conditional_get
+    headers = {**conditional_headers(request, "ndjson" if ndjson else None), "Vary": "Accept"}
+    if ndjson:
+        return StreamingResponse(iter_ndjson(projection), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    with read_session_factory()() as db:
+        earthquakes = EarthquakeService.get_all_earthquakes_simple(db, fields=projection)
+    # Plain dicts of already typed columns: skip per-row model validation
+    return RowsJSONResponse(content=earthquakes, headers=headers)
 
-@router.get("/statistics/by-year")
-def get_statistics_by_year(db: Session = Depends(get_db)):
+@router.get("/near", response_model=EarthquakeNearResponse, dependencies=[Depends(conditional_get)])
+def read_earthquakes_near(
+    db: Session = Depends(get_read_db),
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=20000, description="Search radius; omit for the nearest events"),
+    limit: int = Query(100, ge=1, le=5000),
+    from_date: Optional[str] = Query(None),
+    to_date: Optional[str] = Query(None),
+    from_magnitude: Optional[str] = Query(None),
+    to_magnitude: Optional[str] = Query(None)
+):
+    """
+    Earthquakes around a point, nearest first, with distance in km
+    With radius_km returns every event within the radius (up to limit),
+    otherwise the limit nearest events.
+    For map viewports use the from_/to_latitude and from_/to_longitude
+    filters of the listing endpoint (served by the (lat, lon) index).
+    
+    Example: /earthquakes/near?latitude=41.2995&longitude=69.2401&radius_km=50
+    """
+    results = EarthquakeService.get_earthquakes_near(
+        db,
+        lat=latitude,
+        lon=longitude,
+        radius_km=radius_km,
+        limit=limit,
+        from_date=from_date,
+        to_date=to_date,
+        from_magnitude=parse_float(from_magnitude),
+        to_magnitude=parse_float(to_magnitude)
+    )
+    
+    data = []
+    for earthquake, distance_km in results:
+        earthquake.distance_km = round(float(distance_km), 3)
+        data.append(earthquake)
+    
+    return {
+        "data": data,
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius_km": radius_km
+    }
+
+@router.get("/epicenters/search", dependencies=[Depends(conditional_get)])
+def search_epicenters(
+    db: Session = Depends(get_read_db),
+    q: str = Query(..., min_length=1, description="Place name or its beginning"),
+    prefix: bool = Query(False, description="Autocomplete mode: match names starting with q"),
+    limit: int = Query(10, ge=1, le=100)
+):
+    """
+    Search epicenter place names in Uzbek, Russian and English
+    Backed by trigram indexes and ranked by similarity, suitable for a search box
+    
+    Example: /earthquakes/epicenters/search?q=tosh&prefix=true
+    
+    Returns: [{"name": "Toshkent", "language": "uz", "count": 42, "score": 0.8}, ...]
+    """
+    return EarthquakeService.search_epicenters(db, q, prefix=prefix, limit=limit)
+
+@router.get("/statistics/by-year", dependencies=[Depends(conditional_get)])
+def get_statistics_by_year(db: Session = Depends(get_read_db)):
     """
     Get earthquake count grouped by year
     Returns: [{"year": "2024", "count": 150}, ...]
     """
     return EarthquakeService.get_earthquakes_by_year(db)
 
-@router.get("/statistics/by-month")
+@router.get("/statistics/by-month", dependencies=[Depends(conditional_get)])
 def get_statistics_by_month(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     year: Optional[int] = Query(None, description="Filter by specific year")
 ):
     """
@@ -106,9 +343,9 @@ def get_statistics_by_month(
     """
     return EarthquakeService.get_earthquakes_by_month(db, year)
 
-@router.get("/statistics/magnitude-by-month")
+@router.get("/statistics/magnitude-by-month", dependencies=[Depends(conditional_get)])
 def get_magnitude_statistics_by_month(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     from_year: Optional[int] = Query(None, description="Start year for filtering"),
     to_year: Optional[int] = Query(None, description="End year for filtering")
 ):
@@ -127,9 +364,9 @@ def get_magnitude_statistics_by_month(
     """
     return EarthquakeService.get_magnitude_statistics_by_month(db, from_year, to_year)
 
-@router.get("/statistics/count-by-month")
+@router.get("/statistics/count-by-month", dependencies=[Depends(conditional_get)])
 def get_count_statistics_by_month(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     from_year: Optional[int] = Query(None, description="Start year for filtering"),
     to_year: Optional[int] = Query(None, description="End year for filtering")
 ):
@@ -149,14 +386,192 @@ def get_count_statistics_by_month(
     """
     return EarthquakeService.get_count_statistics_by_month(db, from_year, to_year)
 
+@router.get("/statistics/summary", dependencies=[Depends(conditional_get)])
+def get_statistics_summary(
+    db: Session = Depends(get_read_db),
+    from_year: Optional[int] = Query(None, description="Start year for filtering"),
+    to_year: Optional[int] = Query(None, description="End year for filtering")
+):
+    """
+    All dashboard statistics in one request and one pass over the data
+    Combines by-year (with max magnitude per year), by-month,
+    magnitude-by-month and count-by-month for the same year range
+    
+    Example: /earthquakes/statistics/summary?from_year=2023&to_year=2025
+    
+    Returns: {
+        "by_year": [{"year": "2025", "count": 120, "max_magnitude": 5.1}, ...],
+        "by_month": [{"year": "2025", "month": "03", "count": 12}, ...],
+        "magnitude_by_month": [{"year": "2023", "month": "01", "max_magnitude": 4.5, "count": 10}, ...],
+        "count_by_month": [{"year": "2023", "month": "01", "count": 10}, ...]
+    }
+    """
+    return EarthquakeService.get_statistics_summary(db, from_year, to_year)
+
+@router.get("/statistics/time-series", dependencies=[Depends(conditional_get)])
+def get_time_series(
+    db: Session = Depends(get_read_db),
+    bucket: str = Query("day", pattern=f"^({'|'.join(TIME_BUCKETS)})$"),
+    epicenter: Optional[str] = Query(None),
+    from_date: Optional[str] = Query(None),
+    to_date: Optional[str] = Query(None),
+    from_year: Optional[int] = Query(None),
+    to_year: Optional[int] = Query(None),
+    from_magnitude: Optional[str] = Query(None),
+    to_magnitude: Optional[str] = Query(None),
+    from_depth: Optional[str] = Query(None),
+    to_depth: Optional[str] = Query(None),
+    from_latitude: Optional[str] = Query(None),
+    to_latitude: Optional[str] = Query(None),
+    from_longitude: Optional[str] = Query(None),
+    to_longitude: Optional[str] = Query(None)
+):
+    """
+    Event count and max magnitude per hour, day, week, month or year
+    The series is dense: empty buckets are returned with count 0
+    
+    Example: /earthquakes/statistics/time-series?bucket=day&from_date=01.01.2005&to_date=31.12.2024&from_magnitude=3
+    
+    Returns: {"bucket": "day", "from": "2005-01-01T00:00:00", "to": "2024-12-31T00:00:00",
+              "series": [{"time": "2005-01-01T00:00:00", "count": 2, "max_magnitude": 3.4}, ...]}
+    """
+    try:
+        return EarthquakeService.get_time_series(
+            db,
+            bucket=bucket,
+            epicenter=epicenter,
+            from_date=from_date,
+            to_date=to_date,
+            from_year=from_year,
+            to_year=to_year,
+            from_magnitude=parse_float(from_magnitude),
+            to_magnitude=parse_float(to_magnitude),
+            from_depth=parse_float(from_depth),
+            to_depth=parse_float(to_depth),
+            from_latitude=parse_float(from_latitude),
+            to_latitude=parse_float(to_latitude),
+            from_longitude=parse_float(from_longitude),
+            to_longitude=parse_float(to_longitude)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/analytics/magnitude-frequency", dependencies=[Depends(conditional_get)])
+def get_magnitude_frequency(
+    bin_width: float = Query(DEFAULT_BIN_WIDTH, gt=0, le=1, description="Magnitude bin width"),
+    mc: Optional[str] = Query(None, description="Fixed magnitude of completeness; estimated when omitted"),
+    mc_correction: float = Query(DEFAULT_MC_CORRECTION, ge=0, le=1, description="Added to the max-curvature Mc"),
+    filters: Dict[str, Any] = Depends(region_filters)
+):
+    """
+    Gutenberg-Richter analysis for a time window and region
+    Magnitude-frequency distribution (per bin and cumulative N >= M),
+    magnitude of completeness (maximum curvature) and the maximum
+    likelihood b-value with its uncertainty
+    
+    Example: /earthquakes/analytics/magnitude-frequency?from_year=2010&from_latitude=39&to_latitude=42
+    
+    Returns: {"count": 5230, "mc": 2.3, "b_value": 0.98, "b_value_error": 0.03, "a_value": 6.1,
+              "bins": [{"magnitude": 2.1, "count": 310, "cumulative_count": 5100}, ...]}
+    """
+    return AnalyticsService.get_magnitude_frequency(
+        bin_width=bin_width,
+        mc=parse_float(mc),
+        mc_correction=mc_correction,
+        **filters
+    )
+
+@router.get("/analytics/b-value", dependencies=[Depends(conditional_get)])
+def get_b_value_series(
+    window: str = Query("year", pattern=f"^({'|'.join(TIME_WINDOWS)})$"),
+    bin_width: float = Query(DEFAULT_BIN_WIDTH, gt=0, le=1, description="Magnitude bin width"),
+    mc: Optional[str] = Query(None, description="Fixed magnitude of completeness; estimated per window when omitted"),
+    mc_correction: float = Query(DEFAULT_MC_CORRECTION, ge=0, le=1, description="Added to the max-curvature Mc"),
+    filters: Dict[str, Any] = Depends(region_filters)
+):
+    """
+    Magnitude of completeness and b-value per year or month
+    
+    Example: /earthquakes/analytics/b-value?window=year&from_year=2000
+    
+    Returns: [{"window": "2023", "count": 410, "mc": 2.4, "b_value": 1.02, "b_value_error": 0.09, ...}, ...]
+    """
+    return AnalyticsService.get_b_value_series(
+        window=window,
+        bin_width=bin_width,
+        mc=parse_float(mc),
+        mc_correction=mc_correction,
+        **filters
+    )
+
+@router.get("/heatmap")
+def get_heatmap(
+    cache_headers: Dict[str, str] = Depends(conditional_get),
+    cell_size: float = Query(
+        1.0,
+        ge=0.01,
+        le=10,
+        description=f"Cell size in degrees; {', '.join(map(str, PRECOMPUTED_CELL_SIZES))} are precomputed"
+    ),
+    from_magnitude: Optional[str] = Query(None),
+    to_magnitude: Optional[str] = Query(None),
+    filters: Dict[str, Any] = Depends(region_filters)
+):
+    """
+    Earthquakes aggregated into a lat/lon grid for heatmaps
+    Each cell has the event count, max magnitude and the radiated energy
+    sum in joules (log10 E = 1.5M + 4.8); lat/lon is the cell centre.
+    The from_/to_latitude and from_/to_longitude bounds are the viewport:
+    cells intersecting it are returned
+    
+    Example: /earthquakes/heatmap?cell_size=0.5&from_latitude=37&to_latitude=46&from_longitude=55&to_longitude=74
+    
+    Returns: {"cell_size": 0.5, "precomputed": true, "cells": [{"lat": 41.25, "lon": 69.25, "count": 12, "max_magnitude": 4.1, "energy": 1.6e+11}, ...]}
+    """
+    heatmap = HeatmapService.get_heatmap(
+        cell_size=cell_size,
+        from_magnitude=parse_float(from_magnitude),
+        to_magnitude=parse_float(to_magnitude),
+        **filters
+    )
+    return ORJSONResponse(content=heatmap, headers=cache_headers)
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+def get_tile(
+    z: int,
+    x: int,
+    y: int,
+    cache_headers: Dict[str, str] = Depends(conditional_get)
+):
+    """
+    Mapbox Vector Tile of the events inside tile z/x/y (Web Mercator)
+    One layer "earthquakes": below zoom 8 clustered points with point_count
+    and max_magnitude, from zoom 8 individual events with id, magnitude,
+    depth_km and event_time
+    
+    Example (MapLibre source): {"type": "vector", "tiles": ["http://localhost:8005/api/earthquakes/tiles/{z}/{x}/{y}.mvt"]}
+    """
+    if not 0 <= z <= MAX_ZOOM or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    tile = TileService.get_tile(z, x, y)
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile", headers=cache_headers)
+
 @router.get("/coordinates")
-def get_all_coordinates(db: Session = Depends(get_db)):
+def get_all_coordinates(
+    cache_headers: Dict[str, str] = Depends(conditional_get),
+    db: Session = Depends(get_read_db),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    filters: Dict[str, Any] = Depends(export_filters)
+):
     """
     Get all earthquake coordinates with metadata for shapefile/GIS export
-    Returns ALL earthquakes with their coordinates and key attributes
+    Returns ALL earthquakes (or those matching the listing filters) with
+    their coordinates and key attributes
     Suitable for creating shapefiles, GeoJSON, or other GIS formats
     
     Example: /earthquakes/coordinates
+             /earthquakes/coordinates?fields=id,latitude,longitude,magnitude
+             /earthquakes/coordinates?from_magnitude=4&from_year=2020&to_year=2024
     
     Returns: [
         {
@@ -173,10 +588,15 @@ def get_all_coordinates(db: Session = Depends(get_db)):
         ...
     ]
     """
-    return EarthquakeService.get_all_coordinates(db)
+    projection = _fields_param(fields, COORDINATE_COLUMNS)
+    coordinates = EarthquakeService.get_all_coordinates(db, fields=projection, **filters)
+    return ORJSONResponse(content=coordinates, headers=cache_headers)
 
 @router.get("/geojson")
-def get_geojson_coordinates(db: Session = Depends(get_db)):
+def get_geojson_coordinates(
+    cache_headers: Dict[str, str] = Depends(conditional_get),
+    filters: Dict[str, Any] = Depends(export_filters)
+):
     """
     Get all earthquake coordinates in GeoJSON format for shapefile export
     GeoJSON is the standard format for GIS data and can be directly imported into:
@@ -212,127 +632,178 @@ def get_geojson_coordinates(db: Session = Depends(get_db)):
         ]
     }
     """
-    return EarthquakeService.get_geojson_coordinates(db)
+    return StreamingResponse(iter_geojson(filters), media_type="application/json", headers=cache_headers)
+
+def _export_download(request: Request, name: str, cache_headers: Dict[str, str], stream, filters: Dict[str, Any]):
+    """
+    Serve the prebuilt artifact for the current data version, with Range
+    support (its precompressed variant when the client accepts one); until
+    it is built, stream the export from the database under a "-stream" ETag
+    and have it built in the background. Filtered exports are always streamed.
+    """
+    artifact = ARTIFACTS[name]
+    headers = {**cache_headers, "Content-Disposition": f"attachment; filename={artifact.filename}"}
+    if filter_signature(filters):
+        return StreamingResponse(stream(filters), media_type=artifact.media_type, headers=headers)
+    
+    path = get_artifact(name)
+    if path is None:
+        schedule_refresh()
+        # Not byte-identical to the artifact (ZIP and DBF carry build
+        # timestamps), so its ETag must never satisfy If-Range for the file
+        headers["ETag"] = representation_etag(headers["ETag"], "stream")
+        return StreamingResponse(stream(), media_type=artifact.media_type, headers=headers)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding")) if artifact.precompress else None
+    encoded_path = get_artifact(name, encoding) if encoding else None
+    if encoded_path is not None:
+        headers.update({
+            "ETag": encoded_etag(headers["ETag"], encoding),
+            "Content-Encoding": encoding,
+            "Vary": "Accept-Encoding",
+        })
+        return ranged_file_response(request, encoded_path, artifact.media_type, headers)
+    return ranged_file_response(request, path, artifact.media_type, headers)
 
 @router.get("/download/geojson")
-def download_geojson(db: Session = Depends(get_db)):
+def download_geojson(
+    request: Request,
+    cache_headers: Dict[str, str] = Depends(conditional_get),
+    filters: Dict[str, Any] = Depends(export_filters)
+):
     """
     Download all earthquake data as a GeoJSON file
     This endpoint returns a downloadable .geojson file that can be:
     - Imported directly into QGIS, ArcGIS, Google Earth
     - Converted to shapefile using ogr2ogr
+    Accepts the listing filters; for large filtered exports prefer POST /exports
+    Supports Range requests (resumable downloads) and conditional GET
     
     Example: /earthquakes/download/geojson
+             /earthquakes/download/geojson?from_magnitude=4&from_year=2020&to_year=2024
     """
-    geojson_data = EarthquakeService.get_geojson_coordinates(db)
-    
-    # Convert to JSON string
-    geojson_string = json.dumps(geojson_data, ensure_ascii=False, indent=2)
-    
-    # Create file-like object
-    file_like = io.BytesIO(geojson_string.encode('utf-8'))
-    
-    return StreamingResponse(
-        file_like,
-        media_type="application/geo+json",
-        headers={
-            "Content-Disposition": "attachment; filename=earthquakes.geojson"
-        }
-    )
+    return _export_download(request, "geojson", cache_headers, iter_geojson, filters)
 
 @router.get("/download/shapefile")
-def download_shapefile_zip(db: Session = Depends(get_db)):
+def download_shapefile_zip(
+    request: Request,
+    cache_headers: Dict[str, str] = Depends(conditional_get),
+    filters: Dict[str, Any] = Depends(export_filters)
+):
     """
-    Download all earthquake data as a zipped shapefile package
+    Download all earthquake data as a zipped ESRI Shapefile
     Returns a ZIP file containing:
-    - earthquakes.geojson (can be converted to shapefile)
-    - README.txt (instructions for conversion)
+    - earthquakes.shp, .shx, .dbf (point geometry, index and attributes)
+    - earthquakes.prj (WGS84) and earthquakes.cpg (UTF-8)
+    - README.txt (attribute descriptions)
     
-    The GeoJSON file can be:
-    1. Directly imported into QGIS (drag and drop)
-    2. Converted to shapefile using: ogr2ogr -f "ESRI Shapefile" earthquakes.shp earthquakes.geojson
+    Opens directly in QGIS and ArcGIS, no conversion needed.
+    Accepts the listing filters; for large filtered exports prefer POST /exports
+    Supports Range requests (resumable downloads) and conditional GET
     
     Example: /earthquakes/download/shapefile
     """
-    geojson_data = EarthquakeService.get_geojson_coordinates(db)
+    return _export_download(request, "shapefile", cache_headers, iter_shapefile_zip, filters)
+
+def _tabular_download(cache_headers: Dict[str, str], stream, filename: str, media_type: str, filters: Dict[str, Any]):
+    return StreamingResponse(
+        stream(filters),
+        media_type=media_type,
+        headers={**cache_headers, "Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/download/csv")
+def download_csv(
+    cache_headers: Dict[str, str] = Depends(conditional_get),
+    filters: Dict[str, Any] = Depends(export_filters)
+):
+    """
+    Download earthquakes as CSV (UTF-8, header row, ISO 8601 event_time)
+    Accepts the listing filters
     
-    # Create a ZIP file in memory
-    zip_buffer = io.BytesIO()
+    Example: /earthquakes/download/csv?from_year=2020
+    """
+    return _tabular_download(cache_headers, iter_csv, "earthquakes.csv", "text/csv; charset=utf-8", filters)
+
+@router.get("/download/parquet")
+def download_parquet(
+    cache_headers: Dict[str, str] = Depends(conditional_get),
+    filters: Dict[str, Any] = Depends(export_filters)
+):
+    """
+    Download earthquakes as a Parquet file with typed columns
+    (timestamp event_time, float lat/lon/depth_km/magnitude)
+    Accepts the listing filters
     
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Add GeoJSON file
-        geojson_string = json.dumps(geojson_data, ensure_ascii=False, indent=2)
-        zip_file.writestr('earthquakes.geojson', geojson_string)
-        
-        # Add README with instructions
-        readme_content = """Earthquake Data - Shapefile Package
-=====================================
-
-This package contains earthquake data in GeoJSON format.
-
-FILES:
-------
-- earthquakes.geojson : Earthquake data in GeoJSON format
-
-HOW TO USE:
------------
-
-Option 1: Import to QGIS (Easiest)
-1. Open QGIS
-2. Drag and drop 'earthquakes.geojson' into QGIS
-3. Done!
-
-Option 2: Convert to Shapefile
-Run this command:
-  ogr2ogr -f "ESRI Shapefile" earthquakes.shp earthquakes.geojson
-
-This will create:
-- earthquakes.shp (geometry)
-- earthquakes.shx (index)
-- earthquakes.dbf (attributes)
-- earthquakes.prj (projection)
-
-Option 3: Import to ArcGIS
-1. Open ArcGIS Pro
-2. Add Data -> Data from Path
-3. Select 'earthquakes.geojson'
-4. Right-click layer -> Export Features -> Shapefile
-
-COORDINATE SYSTEM:
-------------------
-WGS84 (EPSG:4326)
-Coordinates: [longitude, latitude]
-
-ATTRIBUTES:
------------
-- id: Database ID
-- earthquake_id: External earthquake ID
-- date: Date (DD.MM.YYYY)
-- time: Time (HH:MM:SS)
-- magnitude: Earthquake magnitude
-- depth: Depth in km
-- epicenter: Epicenter location
-- magnitude_type: Type of magnitude
-- color: Color code for visualization
-
-For more information, visit: http://localhost:8005/docs
-"""
-        zip_file.writestr('README.txt', readme_content)
-    
-    # Reset buffer position
-    zip_buffer.seek(0)
+    Example: pandas.read_parquet("http://localhost:8005/api/earthquakes/download/parquet")
+    """
+    return _tabular_download(cache_headers, iter_parquet, "earthquakes.parquet", "application/vnd.apache.parquet", filters)
+
+@router.get("/download/arrow")
+def download_arrow(
+    cache_headers: Dict[str, str] = Depends(conditional_get),
+    filters: Dict[str, Any] = Depends(export_filters)
+):
+    """
+    Download earthquakes as an Arrow IPC stream with typed columns
+    Accepts the listing filters
     
-    return StreamingResponse(
-        zip_buffer,
-        media_type="application/zip",
-        headers={
-            "Content-Disposition": "attachment; filename=earthquakes_shapefile.zip"
-        }
+    Example: pyarrow.ipc.open_stream(response_bytes).read_all()
+    """
+    return _tabular_download(
+        cache_headers, iter_arrow_stream, "earthquakes.arrows", "application/vnd.apache.arrow.stream", filters
     )
 
+def _export_job_response(request: Request, job: Dict[str, Any]) -> Dict[str, Any]:
+    job["status_url"] = str(request.url_for("read_export", job_id=job["id"]))
+    job["download_url"] = (
+        str(request.url_for("download_export", job_id=job["id"])) if job["status"] == "done" else None
+    )
+    return job
+
+@router.post("/exports", status_code=202)
+def create_export(
+    request: Request,
+    export_format: str = Query("geojson", alias="format", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    filters: Dict[str, Any] = Depends(export_filters)
+):
+    """
+    Start a background export of the earthquakes matching the listing filters
+    Poll the returned status_url until status is "done", then fetch download_url
+    
+    Example: POST /earthquakes/exports?format=shapefile&from_magnitude=4&from_year=2020&to_year=2024
+    
+    Returns: {"id": "...", "status": "pending", "progress": 0.0, "status_url": "...", ...}
+    """
+    job = start_export_job(export_format, filters)
+    return _export_job_response(request, job)
+
+@router.get("/exports/{job_id}")
+def read_export(request: Request, job_id: str):
+    """
+    Status and progress (percent) of an export job
+    download_url is set once status is "done"
+    """
+    job = get_export_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return _export_job_response(request, job)
+
+@router.get("/exports/{job_id}/download")
+def download_export(request: Request, job_id: str):
+    """
+    Download the file of a finished export job (supports Range requests)
+    """
+    export_file = get_export_file(job_id)
+    if export_file is None:
+        raise HTTPException(status_code=404, detail="Export job not found or not finished")
+    path, filename, media_type = export_file
+    headers = {"ETag": f'"{job_id}"', "Content-Disposition": f"attachment; filename={filename}"}
+    return ranged_file_response(request, path, media_type, headers)
+
 @router.post("/sync")
 async def sync_earthquakes(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     page: int = Query(1, ge=1),
     per_page: int = Query(100, ge=1, le=100)
 ):
@@ -346,7 +817,10 @@ async def sync_earthquakes(
         
         # Save to database
         if earthquakes_data:
-            earthquakes, skipped = EarthquakeService.bulk_create_earthquakes(db, earthquakes_data)
+            earthquakes, skipped = await AsyncEarthquakeService.bulk_create_earthquakes(db, earthquakes_data)
+            if earthquakes:
+                await asyncio.to_thread(refresh_precomputed)
+                schedule_refresh()
             return {
                 "detail": f"Successfully synced {len(earthquakes)} earthquakes, skipped {skipped} duplicates",
                 "total_synced": len(earthquakes),
@@ -358,7 +832,7 @@ async def sync_earthquakes(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to sync earthquakes: {str(e)}")
 
-@router.get("/{earthquake_id}", response_model=Earthquake)
+@router.get("/{earthquake_id}", response_model=Earthquake, dependencies=[Depends(conditional_get)])
 def read_earthquake(earthquake_id: int, db: Session = Depends(get_db)):
     db_earthquake = EarthquakeService.get_earthquake(db, earthquake_id=earthquake_id)
     if db_earthquake is None:
@@ -10,9 +10,9 @@ import urllib3
 import time
 from datetime import datetime
 from typing import List, Dict, Any, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from app.db.database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, select
+from app.db.database import AsyncSessionLocal
 from app.models.earthquake import Earthquake
 
 # Disable SSL warnings for self-signed certificates
@@ -438,7 +438,7 @@ async def sync_to_arcgis_task():
         start_time = datetime.now()
         logger.info(f"[{start_time}] Starting ArcGIS sync from database...")
         
-        db: Session = None
+        db: AsyncSession = None
         try:
             # Get ArcGIS token
             token = get_arcgis_token()
@@ -451,8 +451,9 @@ async def sync_to_arcgis_task():
             existing_features = get_existing_arcgis_features(token) if token else []
             
             # Get ALL earthquakes from database
-            db = SessionLocal()
-            earthquakes = db.query(Earthquake).order_by(desc(Earthquake.id)).all()
+            db = AsyncSessionLocal()
+            result = await db.execute(select(Earthquake).order_by(desc(Earthquake.id)))
+            earthquakes = result.scalars().all()
             logger.info(f"📊 Found {len(earthquakes)} total earthquakes in database")
             
             # Filter out duplicates
@@ -517,7 +518,7 @@ async def sync_to_arcgis_task():
         finally:
             # Always close database connection
             if db:
-                db.close()
+                await db.close()
             _is_syncing = False
 
 
@@ -0,0 +1,77 @@
+"""
+Connection pool instrumentation
+Counts checkouts, timeouts and how long callers waited for a connection,
+so pool exhaustion shows up on /health instead of only as slow requests.
+"""
+
+import threading
+import time
+from typing import Dict, Any
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolStats:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_wait(self, wait_ms: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            for index, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self.wait_histogram[index] += 1
+                    break
+            else:
+                self.wait_histogram[-1] += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        """
+        Live pool gauges plus the counters collected so far
+        Histogram buckets are non-cumulative, keyed by upper bound in ms
+        """
+        with self._lock:
+            labels = [f"{bound}ms" for bound in WAIT_BUCKETS_MS] + ["+Inf"]
+            return {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "wait_histogram": dict(zip(labels, self.wait_histogram)),
+            }
+
+
+def instrumented_pool_class(base, stats: PoolStats):
+    """
+    Subclass of a SQLAlchemy pool class that times every checkout
+    The stats object is a class attribute, so it survives pool.recreate()
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except PoolTimeoutError:
+            stats.record_timeout()
+            raise
+        stats.record_wait((time.perf_counter() - start) * 1000)
+        return connection
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get, "stats": stats})
@@ -0,0 +1,181 @@
+"""
+Read-replica routing
+Heavy read-only endpoints take their session from get_read_db /
+get_async_read_db. When DATABASE_REPLICA_URL is set and the replica is
+reachable and no more than REPLICA_MAX_LAG_SECONDS behind, they read from
+it; otherwise they fall back to the primary. Writes and sync paths always
+use the primary sessions from app.db.database.
+
+Read endpoints stamp responses with the in-process data version (ETags,
+count cache, precompressed responses), so a replica must never serve a
+version before it holds that version's writes. After every version bump
+the next check records the primary's pg_current_wal_lsn() as a fence,
+and the replica is used again only once pg_last_wal_replay_lsn() has
+reached it. A replica whose WAL receiver is not streaming is unhealthy:
+it would otherwise report zero lag while falling behind.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import text
+from app.db import database
+from app.services.data_version import get_data_version
+
+logger = logging.getLogger(__name__)
+
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+REPLICA_HEALTH_CHECK_INTERVAL = float(os.getenv("REPLICA_HEALTH_CHECK_INTERVAL", "5"))
+# Re-check interval while the replica has not replayed up to the fence
+REPLICA_FENCE_RECHECK_INTERVAL = 1.0
+
+PRIMARY_LSN_SQL = text("SELECT pg_current_wal_lsn()::text")
+
+# Replica state: replay lag in seconds (0 once everything received is
+# replayed), whether the WAL receiver is streaming, and whether replay has
+# reached the fence LSN. A server that is not in recovery (e.g. a plain
+# second instance used for testing) reports lag 0 and counts as caught up.
+REPLICA_STATE_SQL = text("""
+    SELECT
+        CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END AS lag_seconds,
+        NOT pg_is_in_recovery()
+            OR EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') AS streaming,
+        NOT pg_is_in_recovery()
+            OR COALESCE(pg_last_wal_replay_lsn() >= CAST(:fence_lsn AS pg_lsn), false) AS caught_up
+""")
+
+_check_lock = threading.Lock()
+_replica_state = {
+    "healthy": False,
+    "lag_seconds": None,
+    "error": None,
+    "checked_at": None,
+    "next_check": 0.0,
+    # Data version the fence was taken for, its LSN on the primary, and the
+    # version the replica has been seen to replay up to
+    "fence_version": None,
+    "fence_lsn": None,
+    "caught_up_version": None,
+}
+
+
+def replica_configured() -> bool:
+    return database.replica_engine is not None
+
+
+def _check_due() -> bool:
+    if not replica_configured():
+        return False
+    # A write since the last check needs a new fence before the replica is used again
+    return time.monotonic() >= _replica_state["next_check"] or _replica_state["fence_version"] != get_data_version()
+
+
+def check_replica():
+    """
+    Measure replica lag and replay position and update the cached state
+    Only one thread runs the check; the others keep using the last result
+    """
+    if not _check_lock.acquire(blocking=False):
+        return
+    try:
+        version = get_data_version()
+        caught_up = False
+        try:
+            if _replica_state["fence_version"] != version:
+                # Taken after the write committed, so it covers the write
+                with database.engine.connect() as connection:
+                    _replica_state["fence_lsn"] = connection.execute(PRIMARY_LSN_SQL).scalar()
+                _replica_state["fence_version"] = version
+            with database.replica_engine.connect() as connection:
+                row = connection.execute(REPLICA_STATE_SQL, {"fence_lsn": _replica_state["fence_lsn"]}).one()
+            lag = float(row.lag_seconds or 0)
+            caught_up = bool(row.caught_up)
+            healthy = row.streaming and lag <= REPLICA_MAX_LAG_SECONDS
+            if not row.streaming:
+                error = "replica WAL receiver is not streaming"
+            elif not healthy:
+                error = f"replica lag {lag:.1f}s exceeds {REPLICA_MAX_LAG_SECONDS}s"
+            else:
+                error = None
+        except Exception as e:
+            lag, healthy, error = None, False, str(e)
+        
+        if healthy != _replica_state["healthy"]:
+            if healthy:
+                logger.info("✅ Read replica healthy, routing heavy reads to it")
+            else:
+                logger.warning(f"⚠️ Read replica unavailable, falling back to primary: {error}")
+        if healthy and caught_up:
+            _replica_state["caught_up_version"] = version
+        interval = REPLICA_HEALTH_CHECK_INTERVAL
+        if healthy and not caught_up:
+            interval = min(REPLICA_FENCE_RECHECK_INTERVAL, interval)
+        _replica_state.update(
+            healthy=healthy,
+            lag_seconds=lag,
+            error=error,
+            checked_at=datetime.now(),
+            next_check=time.monotonic() + interval,
+        )
+    finally:
+        _check_lock.release()
+
+
+def _replica_ready() -> bool:
+    # Healthy and holding every write of the version responses are stamped with
+    return _replica_state["healthy"] and _replica_state["caught_up_version"] == get_data_version()
+
+
+def replica_is_usable() -> bool:
+    if not replica_configured():
+        return False
+    if _check_due():
+        check_replica()
+    return _replica_ready()
+
+
+def read_session_factory():
+    """
+    Session factory for read-only work: the replica when usable, else the primary
+    """
+    return database.ReplicaSessionLocal if replica_is_usable() else database.SessionLocal
+
+
+def get_read_db():
+    db = read_session_factory()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    # The health check is blocking, so run it off the event loop when due
+    if _check_due():
+        await asyncio.to_thread(check_replica)
+    factory = database.AsyncReplicaSessionLocal if replica_configured() and _replica_ready() else database.AsyncSessionLocal
+    async with factory() as db:
+        yield db
+
+
+def get_replica_status() -> Optional[dict]:
+    if not replica_configured():
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "healthy": _replica_state["healthy"],
+        "caught_up": _replica_ready(),
+        "fence_lsn": _replica_state["fence_lsn"],
+        "lag_seconds": _replica_state["lag_seconds"],
+        "max_lag_seconds": REPLICA_MAX_LAG_SECONDS,
+        "error": _replica_state["error"],
+        "checked_at": _replica_state["checked_at"].isoformat() if _replica_state["checked_at"] else None,
+    }
@@ -1,8 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
-from app.db.database import engine
-from app.models import earthquake
+from app.api.compression import CompressionMiddleware, get_compression_cache_status
+from app.db.database import engine, get_pool_status, SessionLocal
+from app.db.routing import get_replica_status
+from app.models import earthquake, monthly_stats
+from app.services.rollup_service import RollupService
+from app.services.data_version import bump_data_version
+from app.services.heatmap_service import refresh_precomputed
+from app.services.export_cache import schedule_refresh
 from app.scheduler import start_scheduler, stop_scheduler, get_sync_status
 from app.arcgis_sync_scheduler import (
     start_arcgis_scheduler,
@@ -15,7 +21,7 @@ from app.arcgis_sync_scheduler import (
 import time
 import logging
 from datetime import datetime
-from sqlalchemy import exc
+from sqlalchemy import exc, text
 
 import os
 
@@ -28,6 +34,9 @@ max_retries = 5
 retries = 0
 while retries < max_retries:
     try:
+        # Extensions used by indexes must exist before the tables are created
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         # Create database tables
         earthquake.Base.metadata.create_all(bind=engine)
         logger.info("Successfully connected to the database")
@@ -41,12 +50,22 @@ while retries < max_retries:
             logger.error("Failed to connect to the database after multiple attempts")
             raise
 
+# First start after upgrading: fill the monthly statistics rollup
+with SessionLocal() as db:
+    if RollupService.ensure_built(db):
+        logger.info("Built monthly statistics rollup")
+
 app = FastAPI(
     title="SMRM Earthquake API",
     description="API for earthquake data from SMRM",
     version="0.1.0"
 )
 
+# gzip / brotli for JSON, GeoJSON, CSV and NDJSON responses. Added before
+# CORS so CORS wraps it: responses served from the compression cache still
+# get the Access-Control-* headers of the requesting origin
+app.add_middleware(CompressionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -123,7 +142,10 @@ def health_check():
             "is_syncing": arcgis_status["is_syncing"],
             "last_sync_time": arcgis_status["last_sync_time"],
             "stats": arcgis_status["stats"]
-        }
+        },
+        "database_pool": get_pool_status(),
+        "database_replica": get_replica_status(),
+        "compression_cache": get_compression_cache_status()
     }
 
 @app.get("/sync-status")
@@ -212,6 +234,23 @@ async def disable_arcgis_scheduler():
     return {"status": "success", "arcgis_scheduler": get_arcgis_sync_status()}
 
 
+@app.post("/rollup/rebuild")
+def rebuild_rollup():
+    """
+    Rebuild the monthly statistics rollup after earthquakes were changed
+    outside the API (manual SQL, restores) and mark the catalog as changed,
+    so ETags, cached responses and the in-memory catalog are refreshed
+    """
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        months = RollupService.rebuild(db)
+    bump_data_version()
+    refresh_precomputed()
+    schedule_refresh()
+    logger.info(f"✅ Rebuilt earthquake_monthly_stats: {months} months")
+    return {"status": "success", "months": months, "seconds": round(time.perf_counter() - start, 2)}
+
+
 @app.get("/scheduler/status")
 def scheduler_status():
     return {
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, Index
 from sqlalchemy.sql import func
 from app.db.database import Base
 
@@ -26,3 +26,41 @@ class Earthquake(Base):
     epicenter_en = Column(String, nullable=True)
     created_by = Column(Integer, nullable=True)
     updated_by = Column(Integer, nullable=True)
+
+    # Typed copies of date/time, latitude, longitude and depth.
+    # Derived from the string columns on every write so filters and sorts
+    # can use index range scans instead of substring expressions.
+    event_time = Column(DateTime, nullable=True)
+    lat = Column(Float, nullable=True)
+    lon = Column(Float, nullable=True)
+    depth_km = Column(Float, nullable=True)
+
+    __table_args__ = (
+        Index("ix_earthquakes_event_time_id", "event_time", "id"),
+        Index("ix_earthquakes_magnitude_event_time", "magnitude", "event_time"),
+        Index("ix_earthquakes_lat_lon", "lat", "lon"),
+        Index("ix_earthquakes_depth_km", "depth_km"),
+    )
+
+
+# Default listing order is newest first with unparsed dates at the end;
+# a matching descending index lets it be served without a sort step.
+Index(
+    "ix_earthquakes_event_time_desc_id",
+    Earthquake.event_time.desc().nullslast(),
+    Earthquake.id.desc(),
+)
+
+# GiST index on point(lon, lat) (core PostgreSQL, no PostGIS) for /near:
+# box containment for radius searches and index-ordered <-> for k-NN
+Index("ix_earthquakes_point", func.point(Earthquake.lon, Earthquake.lat), postgresql_using="gist")
+
+# Trigram indexes for the multilingual epicenter search (requires pg_trgm).
+# They serve both '%term%' and 'term%' ILIKE patterns and similarity ranking.
+for _column in (Earthquake.epicenter, Earthquake.epicenter_ru, Earthquake.epicenter_en):
+    Index(
+        f"ix_earthquakes_{_column.key}_trgm",
+        _column,
+        postgresql_using="gin",
+        postgresql_ops={_column.key: "gin_trgm_ops"},
+    )
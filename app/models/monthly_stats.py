@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Float, DateTime
+from app.db.database import Base
+
+class EarthquakeMonthlyStats(Base):
+    """
+    Per-month rollup of the earthquakes table, keyed by event_time year/month
+    Maintained in the same transaction as every write (see RollupService)
+    """
+    __tablename__ = "earthquake_monthly_stats"
+
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    max_magnitude = Column(Float, nullable=True)
+    min_magnitude = Column(Float, nullable=True)
+    sum_magnitude = Column(Float, nullable=True)
+    magnitude_count = Column(Integer, nullable=False, default=0)
+    max_depth = Column(Float, nullable=True)
+    min_depth = Column(Float, nullable=True)
+    sum_depth = Column(Float, nullable=True)
+    depth_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True))
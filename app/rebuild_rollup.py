@@ -0,0 +1,31 @@
+"""
+Rebuild the monthly statistics rollup from the earthquakes table
+Run after bulk changes made outside the API (manual SQL, restores):
+
+    python -m app.rebuild_rollup
+
+The data version behind ETags and the in-memory caches lives in the API
+process, which this script cannot reach: a running API keeps serving its
+cached statistics until its next write or restart. Against a running API
+use POST /rollup/rebuild instead, which rebuilds and refreshes the caches.
+"""
+
+import logging
+import time
+from app.db.database import SessionLocal
+from app.services.rollup_service import RollupService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        months = RollupService.rebuild(db)
+    logger.info(f"✅ Rebuilt earthquake_monthly_stats: {months} months in {time.perf_counter() - start:.2f}s")
+    logger.info("Restart the API (or use POST /rollup/rebuild) so it stops serving cached statistics")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,12 @@ Runs sync task every 10 minutes with duplicate prevention and resource managemen
 import asyncio
 import logging
 from datetime import datetime
-from sqlalchemy.orm import Session
-from app.db.database import SessionLocal
-from app.services.earthquake_service import EarthquakeService
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import AsyncSessionLocal
+from app.services.async_earthquake_service import AsyncEarthquakeService
 from app.services.api_service import ApiService
+from app.services.heatmap_service import refresh_precomputed
+from app.services.export_cache import schedule_refresh
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -40,10 +42,10 @@ async def sync_earthquakes_task():
         start_time = datetime.now()
         logger.info(f"[{start_time}] Starting automatic earthquake sync from external API...")
         
-        db: Session = None
+        db: AsyncSession = None
         try:
-            # Create database session
-            db = SessionLocal()
+            # Create database session (async, so the event loop keeps serving requests)
+            db = AsyncSessionLocal()
             
             # Fetch data from external API (page 1, 100 records per page)
             api_data = await ApiService.fetch_earthquakes(page=1, per_page=100)
@@ -54,7 +56,13 @@ async def sync_earthquakes_task():
             
             if earthquakes_data:
                 # Save to database
-                earthquakes, skipped = EarthquakeService.bulk_create_earthquakes(db, earthquakes_data)
+                earthquakes, skipped = await AsyncEarthquakeService.bulk_create_earthquakes(db, earthquakes_data)
+                
+                # Rebuild the precomputed heatmap grids and, in the background,
+                # the download artifacts for the new data version
+                if earthquakes:
+                    await asyncio.to_thread(refresh_precomputed)
+                    schedule_refresh()
                 
                 end_time = datetime.now()
                 duration = (end_time - start_time).total_seconds()
@@ -74,7 +82,7 @@ async def sync_earthquakes_task():
         finally:
             # Always close database connection
             if db:
-                db.close()
+                await db.close()
             _is_syncing = False
 
 
@@ -63,13 +63,28 @@ class Earthquake(EarthquakeBase):
     created_at: datetime
     updated_at: datetime
     earthquake_id: Optional[int] = None
+    event_time: Optional[datetime] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    depth_km: Optional[float] = None
 
     class Config:
         orm_mode = True
 
 class EarthquakeResponse(BaseModel):
     data: list[Earthquake]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
     page: int
     per_page: int
-    last_page: int
+    last_page: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class EarthquakeNear(Earthquake):
+    distance_km: float
+
+class EarthquakeNearResponse(BaseModel):
+    data: list[EarthquakeNear]
+    latitude: float
+    longitude: float
+    radius_km: Optional[float] = None
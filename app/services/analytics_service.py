@@ -0,0 +1,266 @@
+"""
+Magnitude-frequency (Gutenberg-Richter) analytics
+The magnitude, time, position and depth of every event are loaded once
+into NumPy arrays and kept until the next write bumps the data version. Each request then filters and bins the arrays with
+vectorized operations instead of querying and looping over rows.
+
+Methods:
+- Mc by maximum curvature (the most populated magnitude bin) plus a
+  configurable correction, +0.2 by default (Woessner & Wiemer, 2005)
+- b-value by the Aki-Utsu maximum likelihood estimator with the bin
+  width correction, uncertainty after Shi & Bolt (1982)
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from app.db.database import SessionLocal
+from app.models.earthquake import Earthquake
+from app.services.data_version import get_data_version
+from app.services.earthquake_service import parse_date
+
+DEFAULT_BIN_WIDTH = 0.1
+DEFAULT_MC_CORRECTION = 0.2
+
+# Fewer events above Mc than this give no meaningful b-value
+B_VALUE_MIN_EVENTS = 50
+
+TIME_WINDOWS = {"year": "datetime64[Y]", "month": "datetime64[M]"}
+
+
+class Catalog(NamedTuple):
+    id: np.ndarray
+    magnitude: np.ndarray
+    event_time: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    depth_km: np.ndarray
+
+
+_lock = threading.Lock()
+_catalog: Optional[Catalog] = None
+_catalog_version: Optional[int] = None
+
+
+def _load() -> Catalog:
+    # Always read from the primary: the arrays are cached under the current
+    # data version, which a lagging replica may not have caught up with yet
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(
+                Earthquake.id,
+                Earthquake.magnitude,
+                Earthquake.event_time,
+                Earthquake.lat,
+                Earthquake.lon,
+                Earthquake.depth_km,
+            )
+            .order_by(Earthquake.event_time)
+        ).all()
+
+    if not rows:
+        empty = np.array([], dtype=np.float64)
+        return Catalog(np.array([], dtype=np.int64), empty, np.array([], dtype="datetime64[s]"), empty, empty, empty)
+
+    ids, magnitude, event_time, lat, lon, depth_km = zip(*rows)
+    # None becomes NaN / NaT, which every comparison below treats as "no match"
+    return Catalog(
+        id=np.array(ids, dtype=np.int64),
+        magnitude=np.array(magnitude, dtype=np.float64),
+        event_time=np.array(event_time, dtype="datetime64[s]"),
+        lat=np.array(lat, dtype=np.float64),
+        lon=np.array(lon, dtype=np.float64),
+        depth_km=np.array(depth_km, dtype=np.float64),
+    )
+
+
+def get_catalog() -> Catalog:
+    """
+    Catalog arrays for the current data version, loaded on first use
+    """
+    global _catalog, _catalog_version
+    version = get_data_version()
+    if _catalog is not None and _catalog_version == version:
+        return _catalog
+
+    with _lock:
+        if _catalog is None or _catalog_version != version:
+            _catalog = _load()
+            _catalog_version = version
+        return _catalog
+
+
+def _bounds(mask: np.ndarray, values: np.ndarray, low, high) -> np.ndarray:
+    if low is not None:
+        mask &= values >= low
+    if high is not None:
+        mask &= values <= high
+    return mask
+
+
+def select_events(
+    catalog: Catalog,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    from_year: Optional[int] = None,
+    to_year: Optional[int] = None,
+    from_depth: Optional[float] = None,
+    to_depth: Optional[float] = None,
+    from_latitude: Optional[float] = None,
+    to_latitude: Optional[float] = None,
+    from_longitude: Optional[float] = None,
+    to_longitude: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Boolean mask of the events matching the time window and region
+    Same semantics as the listing filters: to_date includes the whole day
+    """
+    mask = np.ones(len(catalog.magnitude), dtype=bool)
+
+    start = parse_date(from_date)
+    if start is not None:
+        mask &= catalog.event_time >= np.datetime64(start, "s")
+
+    end = parse_date(to_date)
+    if end is not None:
+        mask &= catalog.event_time < np.datetime64(end + timedelta(days=1), "s")
+
+    if from_year is not None:
+        mask &= catalog.event_time >= np.datetime64(datetime(from_year, 1, 1), "s")
+
+    if to_year is not None:
+        mask &= catalog.event_time < np.datetime64(datetime(to_year + 1, 1, 1), "s")
+
+    mask = _bounds(mask, catalog.depth_km, from_depth, to_depth)
+    mask = _bounds(mask, catalog.lat, from_latitude, to_latitude)
+    mask = _bounds(mask, catalog.lon, from_longitude, to_longitude)
+    return mask
+
+
+def magnitude_bins(magnitudes: np.ndarray, bin_width: float):
+    """
+    Non-cumulative and cumulative (N >= M) counts per magnitude bin
+    Returns: (bin magnitudes, counts, cumulative counts), empty if no events
+    """
+    if magnitudes.size == 0:
+        empty = np.array([], dtype=np.int64)
+        return np.array([], dtype=np.float64), empty, empty
+
+    index = np.round(magnitudes / bin_width).astype(np.int64)
+    first = index.min()
+    counts = np.bincount(index - first)
+    cumulative = np.cumsum(counts[::-1])[::-1]
+    bins = (np.arange(counts.size) + first) * bin_width
+    return np.round(bins, 6), counts, cumulative
+
+
+def completeness_magnitude(bins: np.ndarray, counts: np.ndarray, correction: float) -> Optional[float]:
+    """
+    Magnitude of completeness by maximum curvature
+    """
+    if counts.size == 0:
+        return None
+    return round(float(bins[np.argmax(counts)]) + correction, 6)
+
+
+def b_value(magnitudes: np.ndarray, mc: Optional[float], bin_width: float) -> Dict[str, Any]:
+    """
+    Aki-Utsu maximum likelihood b-value for the events at or above Mc
+    Returns: {"b_value", "b_value_error", "a_value", "events_above_mc"};
+    the estimates are None when fewer than B_VALUE_MIN_EVENTS qualify
+    """
+    if mc is None:
+        return {"b_value": None, "b_value_error": None, "a_value": None, "events_above_mc": 0}
+
+    above = magnitudes[magnitudes >= mc - bin_width / 2 - 1e-9]
+    n = int(above.size)
+    result = {"b_value": None, "b_value_error": None, "a_value": None, "events_above_mc": n}
+    if n < B_VALUE_MIN_EVENTS:
+        return result
+
+    mean = float(above.mean())
+    spread = mean - (mc - bin_width / 2)
+    if spread <= 0:
+        return result
+
+    b = np.log10(np.e) / spread
+    error = 2.3 * b ** 2 * np.sqrt(np.sum((above - mean) ** 2) / (n * (n - 1)))
+    result.update({
+        "b_value": round(float(b), 4),
+        "b_value_error": round(float(error), 4),
+        "a_value": round(float(np.log10(n) + b * mc), 4),
+    })
+    return result
+
+
+def _analyse(magnitudes: np.ndarray, bin_width: float, mc: Optional[float], mc_correction: float) -> Dict[str, Any]:
+    bins, counts, cumulative = magnitude_bins(magnitudes, bin_width)
+    estimated = mc is None
+    if estimated:
+        mc = completeness_magnitude(bins, counts, mc_correction)
+    return {
+        "count": int(magnitudes.size),
+        "mc": mc,
+        "mc_method": "maxc" if estimated else "fixed",
+        **b_value(magnitudes, mc, bin_width),
+        "_fmd": (bins, counts, cumulative),
+    }
+
+
+class AnalyticsService:
+    @staticmethod
+    def get_magnitude_frequency(
+        bin_width: float = DEFAULT_BIN_WIDTH,
+        mc: Optional[float] = None,
+        mc_correction: float = DEFAULT_MC_CORRECTION,
+        **filters
+    ) -> Dict[str, Any]:
+        """
+        Magnitude-frequency distribution with Mc and b-value for one
+        time window / region
+        Returns: {"count", "bin_width", "mc", "b_value", ..., "bins": [{"magnitude", "count", "cumulative_count"}]}
+        """
+        catalog = get_catalog()
+        mask = select_events(catalog, **filters) & ~np.isnan(catalog.magnitude)
+        magnitudes = catalog.magnitude[mask]
+        result = _analyse(magnitudes, bin_width, mc, mc_correction)
+        bins, counts, cumulative = result.pop("_fmd")
+
+        result["bin_width"] = bin_width
+        result["bins"] = [
+            {"magnitude": magnitude, "count": count, "cumulative_count": total}
+            for magnitude, count, total in zip(bins.tolist(), counts.tolist(), cumulative.tolist())
+            if count
+        ]
+        return result
+
+    @staticmethod
+    def get_b_value_series(
+        window: str = "year",
+        bin_width: float = DEFAULT_BIN_WIDTH,
+        mc: Optional[float] = None,
+        mc_correction: float = DEFAULT_MC_CORRECTION,
+        **filters
+    ) -> List[Dict[str, Any]]:
+        """
+        Mc and b-value per calendar year or month
+        Returns: [{"window": "2024", "count", "mc", "b_value", ...}, ...] oldest first
+        """
+        catalog = get_catalog()
+        mask = select_events(catalog, **filters) & ~np.isnan(catalog.magnitude) & ~np.isnat(catalog.event_time)
+        magnitudes = catalog.magnitude[mask]
+        # The catalog is loaded in event_time order, so windows are contiguous
+        windows = catalog.event_time[mask].astype(TIME_WINDOWS[window])
+        labels, starts = np.unique(windows, return_index=True)
+        ends = np.append(starts[1:], windows.size)
+
+        series = []
+        for label, start, end in zip(labels, starts, ends):
+            result = _analyse(magnitudes[start:end], bin_width, mc, mc_correction)
+            result.pop("_fmd")
+            series.append({"window": str(label).replace("-", "."), **result})
+        return series
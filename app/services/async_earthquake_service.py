@@ -0,0 +1,210 @@
+"""
+Listing, counting and bulk inserts on the event loop
+The endpoints and the scheduler run these through an AsyncSession
+(asyncpg). Statements, filters, sorting, cursors, projections and the
+count cache come from the helpers in earthquake_service, which the sync
+reads (statistics, exports, /near, ...) use as well.
+"""
+
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.earthquake import Earthquake
+from app.services.data_version import get_data_version, bump_data_version
+from app.services.rollup_service import RollupService, month_of
+from app.services.earthquake_service import (
+    EarthquakeService,
+    ESTIMATED_COUNT_MIN_ROWS,
+    apply_typed_columns,
+    count_statement,
+    decode_cursor,
+    duplicate_statements,
+    explain_sql,
+    filter_signature,
+    get_cached_count,
+    plan_rows_estimate,
+    prepare_external_record,
+    reltuples_estimate,
+    reltuples_statement,
+    rows_to_dicts,
+    store_cached_count,
+)
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEarthquakeService:
+    @staticmethod
+    async def _fetch(db: AsyncSession, stmt, fields: Optional[List[str]] = None):
+        result = await db.execute(stmt)
+        return result.scalars().all() if fields is None else result.all()
+
+    @staticmethod
+    async def get_earthquakes(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        sort: str = "datetime_desc",
+        count_mode: Optional[str] = "exact",
+        fields: Optional[List[str]] = None,
+        **filters
+    ):
+        """
+        Get one page of earthquakes
+        filters are the listing filters (see EarthquakeService._apply_filters)
+        count_mode: "exact" (cached per filter set), "estimated" (planner
+        statistics) or None to skip the total entirely
+        fields: column projection (see RESPONSE_COLUMNS); rows are then
+        returned as dicts with only those keys
+        Returns: (earthquakes, total, total_is_estimate)
+        """
+        stmt = EarthquakeService._apply_filters(EarthquakeService._listing_statement(fields), **filters)
+        
+        total, total_is_estimate = await AsyncEarthquakeService.count_earthquakes(db, stmt, filters, count_mode)
+        
+        stmt = EarthquakeService._apply_sort(stmt, sort, filters.get("epicenter")).offset(skip).limit(limit)
+        
+        earthquakes = await AsyncEarthquakeService._fetch(db, stmt, fields)
+        
+        if fields is not None:
+            earthquakes = rows_to_dicts(earthquakes)
+        return earthquakes, total, total_is_estimate
+
+    @staticmethod
+    async def get_earthquakes_by_cursor(
+        db: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        sort: str = "datetime_desc",
+        count_mode: Optional[str] = "exact",
+        fields: Optional[List[str]] = None,
+        **filters
+    ):
+        """
+        Keyset pagination over (event_time, id)
+        Accepts the same filters and fields as get_earthquakes. An empty cursor starts at
+        the first page; each page costs one index range scan regardless of
+        how deep it is.
+        Returns: (earthquakes, total, total_is_estimate, next_cursor)
+        """
+        sort = "datetime_asc" if sort == "datetime_asc" else "datetime_desc"
+        position = decode_cursor(cursor, sort)
+        
+        base = EarthquakeService._apply_filters(EarthquakeService._listing_statement(fields), **filters)
+        total, total_is_estimate = await AsyncEarthquakeService.count_earthquakes(db, base, filters, count_mode)
+        
+        earthquakes = []
+        dated = EarthquakeService._cursor_dated_statement(base, position, sort, limit)
+        if dated is not None:
+            earthquakes = await AsyncEarthquakeService._fetch(db, dated, fields)
+        if len(earthquakes) <= limit:
+            tail = EarthquakeService._cursor_tail_statement(base, position, sort, limit + 1 - len(earthquakes))
+            earthquakes += await AsyncEarthquakeService._fetch(db, tail, fields)
+        
+        earthquakes, next_cursor = EarthquakeService._cursor_page(earthquakes, limit, sort, fields)
+        return earthquakes, total, total_is_estimate, next_cursor
+
+    @staticmethod
+    async def count_earthquakes(db: AsyncSession, stmt, filters: Dict[str, Any], count_mode: Optional[str] = "exact"):
+        """
+        Total for a filtered listing statement
+        Exact counts are cached per filter signature until the next write.
+        Estimated counts read pg_class.reltuples for unfiltered queries and
+        the planner row estimate otherwise; estimates below
+        ESTIMATED_COUNT_MIN_ROWS, or none at all, fall back to an exact count.
+        Returns: (total, is_estimate), (None, False) when count_mode is None
+        """
+        if count_mode is None:
+            return None, False
+        
+        signature = filter_signature(filters)
+        
+        if count_mode == "estimated":
+            estimate = await AsyncEarthquakeService._estimate_count(db, stmt, bool(signature))
+            if estimate is not None and estimate >= ESTIMATED_COUNT_MIN_ROWS:
+                return estimate, True
+        
+        version = get_data_version()
+        total = get_cached_count(signature, version)
+        if total is None:
+            total = (await db.execute(count_statement(stmt))).scalar()
+            store_cached_count(signature, version, total)
+        return total, False
+
+    @staticmethod
+    async def _estimate_count(db: AsyncSession, stmt, filtered: bool):
+        """
+        Row estimate from planner statistics, or None if unavailable
+        """
+        if not filtered:
+            return reltuples_estimate((await db.execute(reltuples_statement())).scalar())
+        connection = await db.connection()
+        result = await connection.exec_driver_sql(explain_sql(stmt, db.get_bind().dialect))
+        return plan_rows_estimate(result.scalar())
+
+    @staticmethod
+    async def get_earthquake(db: AsyncSession, earthquake_id: int):
+        result = await db.execute(select(Earthquake).filter(Earthquake.id == earthquake_id))
+        return result.scalars().first()
+
+    @staticmethod
+    async def bulk_create_earthquakes(db: AsyncSession, earthquakes_data: List[Dict[str, Any]]):
+        """
+        Insert new records from the external API, skipping duplicates, and
+        refresh the rollup months they fall in, all in one commit
+        Returns: (inserted, skipped)
+        """
+        now = datetime.now()
+        earthquakes = []
+        skipped = 0
+        
+        for data in earthquakes_data:
+            try:
+                earthquake_data = prepare_external_record(data)
+                
+                # Skip records that already exist (by external id or by date/time/location)
+                duplicate = False
+                for stmt in duplicate_statements(earthquake_data):
+                    if (await db.execute(stmt)).first():
+                        duplicate = True
+                        break
+                if duplicate:
+                    skipped += 1
+                    continue
+                
+                earthquake = Earthquake(
+                    **earthquake_data,
+                    created_at=now,
+                    updated_at=now
+                )
+                apply_typed_columns(earthquake)
+                earthquakes.append(earthquake)
+                
+            except Exception as e:
+                # Skip problematic records and continue
+                logger.warning("⚠️ Skipping earthquake %s due to error: %s", data.get("id"), e)
+                skipped += 1
+                continue
+        
+        # Insert one by one inside savepoints so a bad row only drops itself
+        inserted = []
+        for earthquake in earthquakes:
+            try:
+                async with db.begin_nested():
+                    db.add(earthquake)
+                inserted.append(earthquake)
+            except Exception as e:
+                logger.warning("⚠️ Failed to insert earthquake %s: %s", earthquake.earthquake_id, e)
+                skipped += 1
+        
+        if inserted:
+            months = [month_of(earthquake.event_time) for earthquake in inserted]
+            for stmt in RollupService.refresh_statements(months):
+                await db.execute(stmt)
+            await db.commit()
+            bump_data_version()
+        
+        return inserted, skipped
@@ -0,0 +1,115 @@
+"""
+gzip / brotli content codings
+Shared by the compression middleware and the precompressed export
+artifacts. brotli is optional; without it only gzip is offered.
+"""
+
+import gzip
+import shutil
+import zlib
+from typing import Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+FILE_CHUNK_SIZE = 1024 * 1024
+
+# Content coding -> file name extension of a precompressed variant
+FILE_EXTENSIONS = {"gzip": ".gz", "br": ".br"}
+ETAG_SUFFIXES = {"gzip": "-gzip", "br": "-br"}
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Preferred content coding the client accepts: br, then gzip
+    Returns None when only identity is acceptable
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in supported_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    ETag of the encoded representation: '"v-hash"' -> '"v-hash-gzip"'
+    """
+    if etag.endswith('"'):
+        return etag[:-1] + ETAG_SUFFIXES[encoding] + '"'
+    return etag + ETAG_SUFFIXES[encoding]
+
+
+def strip_etag_suffix(etag: str) -> str:
+    """
+    ETag of the identity representation an encoded ETag belongs to
+    """
+    for suffix in ETAG_SUFFIXES.values():
+        if etag.endswith(suffix + '"'):
+            return etag[:-len(suffix) - 1] + '"'
+    return etag
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """
+    Incremental compressor; every chunk is flushed, so streamed rows reach
+    the client without waiting for the compressor's window to fill
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress_file(source: str, target: str, encoding: str) -> None:
+    """
+    Write the encoded variant of source to target, chunk by chunk
+    """
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        if encoding == "gzip":
+            with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as gz:
+                shutil.copyfileobj(src, gz, FILE_CHUNK_SIZE)
+            return
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for data in iter(lambda: src.read(FILE_CHUNK_SIZE), b""):
+            dst.write(compressor.process(data))
+        dst.write(compressor.finish())
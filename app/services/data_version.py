@@ -0,0 +1,42 @@
+"""
+Catalog data version
+A monotonically increasing number bumped by every committed write in
+EarthquakeService. Read endpoints derive ETag / Last-Modified from it and
+caches key their entries on it, so nothing has to ask the database
+whether the catalog changed.
+
+The version lives in process memory, which matches the single uvicorn
+process that serves the API and runs the schedulers. It starts from the
+current time, so a restart invalidates every client copy once instead of
+ever reusing an old version number.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+
+_lock = threading.Lock()
+_version = time.time_ns() // 1000
+_last_modified = datetime.now(timezone.utc)
+
+
+def get_data_version() -> int:
+    return _version
+
+
+def get_last_modified() -> datetime:
+    """
+    UTC time of the last write (or of process start)
+    """
+    return _last_modified
+
+
+def bump_data_version() -> int:
+    """
+    Mark the catalog as changed; call after the write has been committed
+    """
+    global _version, _last_modified
+    with _lock:
+        _version = max(_version + 1, time.time_ns() // 1000)
+        _last_modified = datetime.now(timezone.utc)
+        return _version
@@ -1,59 +1,493 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case, Integer
+from sqlalchemy import func, tuple_, text, or_, union_all, literal, select
 from app.models.earthquake import Earthquake
+from app.models.monthly_stats import EarthquakeMonthlyStats
 from app.schemas.earthquake import EarthquakeCreate, EarthquakeUpdate
-from datetime import datetime
+from app.services.data_version import bump_data_version
+from app.services.rollup_service import RollupService, month_of
+from app.services.geo import bounding_box, haversine_expression, planar_distance, within_box
+from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
+import base64
+import json
+
+
+# Exact listing totals keyed by normalized filter signature, each stored with
+# the data version it was counted at. Any write bumps the version, which
+# makes every entry stale, including counts that raced with the write.
+_count_cache: Dict[tuple, tuple] = {}
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+# Batch size of the lean bulk reads behind /all and /coordinates
+LEAN_FETCH_BATCH_SIZE = 5000
+
+# In estimated mode, planner estimates below this are replaced by an exact
+# count: narrow filters are cheap to count and poorly estimated.
+ESTIMATED_COUNT_MIN_ROWS = 10000
+
+
+DATE_FORMATS = ("%d.%m.%Y", "%Y.%m.%d", "%Y-%m-%d", "%Y/%m/%d", "%d-%m-%Y")
+TIME_FORMATS = ("%H:%M:%S", "%H:%M:%S.%f", "%H:%M")
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a date string in any of the formats used by the external API or
+    by manually created records. Returns None if it cannot be parsed.
+    """
+    if not value:
+        return None
+    s = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_event_time(date_value: Optional[str], time_value: Optional[str]) -> Optional[datetime]:
+    """
+    Combine the string date and time columns into a single timestamp.
+    A missing or unparseable time falls back to midnight of that date.
+    """
+    event_date = parse_date(date_value)
+    if event_date is None:
+        return None
+    if time_value:
+        s = str(time_value).strip()
+        for fmt in TIME_FORMATS:
+            try:
+                t = datetime.strptime(s, fmt).time()
+                return datetime.combine(event_date.date(), t)
+            except ValueError:
+                continue
+    return event_date
+
+
+def parse_float(value: Any) -> Optional[float]:
+    """
+    Convert a numeric string (or number) to float, returning None for
+    empty or invalid values
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    s = str(value).strip().replace(",", ".")
+    if not s:
+        return None
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def apply_typed_columns(earthquake: Earthquake) -> Earthquake:
+    """
+    Fill event_time, lat, lon and depth_km from the string columns
+    """
+    earthquake.event_time = parse_event_time(earthquake.date, earthquake.time)
+    earthquake.lat = parse_float(earthquake.latitude)
+    earthquake.lon = parse_float(earthquake.longitude)
+    earthquake.depth_km = parse_float(earthquake.depth)
+    return earthquake
+
+
+def encode_cursor(event_time: Optional[datetime], earthquake_id: int, sort: str) -> str:
+    """
+    Build an opaque keyset cursor pointing just after the given row
+    """
+    payload = {
+        "s": sort,
+        "t": event_time.isoformat() if event_time else None,
+        "i": earthquake_id,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode a cursor produced by encode_cursor
+    Returns None for an empty cursor (first page), raises ValueError if the
+    cursor is malformed or was issued for a different sort order
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        position = {
+            "t": datetime.fromisoformat(payload["t"]) if payload["t"] else None,
+            "i": int(payload["i"]),
+        }
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+    if payload.get("s") != sort:
+        raise ValueError("Cursor was issued for a different sort order")
+    return position
+
+
+def get_cached_count(signature: tuple, version: int) -> Optional[int]:
+    cached = _count_cache.get(signature)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    return None
+
+
+def store_cached_count(signature: tuple, version: int, total: int):
+    if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.clear()
+    _count_cache[signature] = (version, total)
+
+
+def count_statement(stmt):
+    """
+    SELECT count(*) over a listing statement (ordering dropped)
+    """
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+
+def reltuples_statement():
+    return text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)").bindparams(
+        table=Earthquake.__tablename__
+    )
+
+
+def reltuples_estimate(reltuples) -> Optional[int]:
+    # reltuples is -1 until the table has been analyzed
+    if reltuples is None or reltuples < 0:
+        return None
+    return int(reltuples)
+
+
+def explain_sql(stmt, dialect) -> str:
+    """
+    EXPLAIN (FORMAT JSON) for a statement, with parameters rendered inline
+    so it can run through exec_driver_sql on any driver
+    """
+    compiled = stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    return f"EXPLAIN (FORMAT JSON) {compiled}"
+
+
+def plan_rows_estimate(plan) -> int:
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def filter_signature(filters: Dict[str, Any]) -> tuple:
+    """
+    Normalize a filter dict into a hashable key, so equivalent requests
+    (" Tashkent" vs "tashkent", "4" vs "4.0") share one cache entry
+    """
+    normalized = []
+    for key, value in sorted(filters.items()):
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        if key == "epicenter_mode" and not filters.get("epicenter"):
+            continue
+        if key in ("from_date", "to_date"):
+            parsed = parse_date(value)
+            if parsed is None:
+                continue
+            value = parsed.date().isoformat()
+        elif key == "epicenter":
+            value = value.strip().lower()
+        elif isinstance(value, float):
+            value = round(value, 6)
+        normalized.append((key, value))
+    return tuple(normalized)
+
+
+EPICENTER_COLUMNS = (
+    ("uz", Earthquake.epicenter),
+    ("ru", Earthquake.epicenter_ru),
+    ("en", Earthquake.epicenter_en),
+)
+
+
+def _like_pattern(value: str, prefix: bool = False) -> str:
+    """
+    Escape LIKE wildcards in user input and wrap it for contains/prefix matching
+    """
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%" if prefix else f"%{escaped}%"
+
+
+def epicenter_condition(epicenter: str, prefix: bool = False):
+    """
+    Match the search term against all three epicenter columns
+    Each ILIKE is served by the column's pg_trgm GIN index (BitmapOr)
+    """
+    pattern = _like_pattern(epicenter.strip(), prefix)
+    return or_(*[column.ilike(pattern, escape="\\") for _, column in EPICENTER_COLUMNS])
+
+
+def epicenter_relevance(epicenter: str):
+    """
+    Best trigram word similarity of the search term across the epicenter columns
+    """
+    term = epicenter.strip()
+    return func.greatest(*[func.word_similarity(term, column) for _, column in EPICENTER_COLUMNS])
+
+
+# Columns selectable through the fields= projection, in response order.
+# date is rendered like the Earthquake schema validator does (YYYY.MM.DD).
+RESPONSE_COLUMNS = {
+    "id": Earthquake.id,
+    "date": func.coalesce(func.to_char(Earthquake.event_time, "YYYY.MM.DD"), Earthquake.date),
+    "time": Earthquake.time,
+    "latitude": Earthquake.latitude,
+    "longitude": Earthquake.longitude,
+    "depth": Earthquake.depth,
+    "magnitude": Earthquake.magnitude,
+    "color": Earthquake.color,
+    "epicenter": Earthquake.epicenter,
+    "description": Earthquake.description,
+    "is_influence": Earthquake.is_influence,
+    "seisprog_id": Earthquake.seisprog_id,
+    "is_perceptabily": Earthquake.is_perceptabily,
+    "magnitude_type": Earthquake.magnitude_type,
+    "epicenter_ru": Earthquake.epicenter_ru,
+    "epicenter_en": Earthquake.epicenter_en,
+    "created_by": Earthquake.created_by,
+    "updated_by": Earthquake.updated_by,
+    "created_at": Earthquake.created_at,
+    "updated_at": Earthquake.updated_at,
+    "earthquake_id": Earthquake.earthquake_id,
+    "event_time": Earthquake.event_time,
+    "lat": Earthquake.lat,
+    "lon": Earthquake.lon,
+    "depth_km": Earthquake.depth_km,
+}
+
+# Columns of the /coordinates export, already typed in the database
+# (a zero magnitude has always been reported as null here)
+COORDINATE_COLUMNS = {
+    "id": Earthquake.id,
+    "latitude": Earthquake.lat,
+    "longitude": Earthquake.lon,
+    "magnitude": func.nullif(Earthquake.magnitude, 0),
+    "depth": Earthquake.depth_km,
+    "date": Earthquake.date,
+    "time": Earthquake.time,
+    "epicenter": Earthquake.epicenter,
+    "earthquake_id": Earthquake.earthquake_id,
+}
+
+
+def parse_fields(fields: Optional[str], allowed: Dict[str, Any]) -> Optional[List[str]]:
+    """
+    Parse a comma separated fields= value
+    Returns None when no projection was requested, raises ValueError for
+    unknown field names
+    """
+    if fields is None or not fields.strip():
+        return None
+    names = []
+    for name in fields.split(","):
+        name = name.strip()
+        if not name or name in names:
+            continue
+        if name not in allowed:
+            raise ValueError(f"Unknown field '{name}'. Allowed: {', '.join(allowed)}")
+        names.append(name)
+    return names or None
+
+
+def rows_to_dicts(rows) -> List[Dict[str, Any]]:
+    """
+    Turn projected result rows into plain dicts, dropping private columns
+    """
+    return [
+        {key: value for key, value in row._mapping.items() if not key.startswith("_")}
+        for row in rows
+    ]
+
+
+def fetch_dicts(db: Session, columns: Dict[str, Any], names: List[str], stmt_filter=None) -> List[Dict[str, Any]]:
+    """
+    Lean bulk read: only the named columns, fetched as plain tuples in
+    batches of LEAN_FETCH_BATCH_SIZE and turned into dicts. Nothing is
+    hydrated into ORM objects or added to the session identity map.
+    stmt_filter, if given, is applied to the select (e.g. listing filters)
+    """
+    stmt = select(*[columns[name].label(name) for name in names])
+    if stmt_filter is not None:
+        stmt = stmt_filter(stmt)
+    result = db.execute(stmt.order_by(Earthquake.id).execution_options(yield_per=LEAN_FETCH_BATCH_SIZE))
+    rows = []
+    for batch in result.partitions():
+        rows.extend(dict(zip(names, row)) for row in batch)
+    return rows
+
+
+def _row_position(row):
+    """
+    (event_time, id) of an ORM row or of a projected row
+    """
+    if isinstance(row, Earthquake):
+        return row.event_time, row.id
+    return row._mapping["_event_time"], row._mapping["_id"]
+
+
+TIME_BUCKETS = ("hour", "day", "week", "month", "year")
+
+# Upper bound on the length of a zero-filled series (~11 years of hours)
+MAX_TIME_SERIES_BUCKETS = 100000
+
+
+def truncate_time(value: datetime, bucket: str) -> datetime:
+    """
+    Start of the bucket containing value, matching PostgreSQL date_trunc
+    (weeks start on Monday)
+    """
+    if bucket == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    day = datetime(value.year, value.month, value.day)
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def next_bucket(start: datetime, bucket: str) -> datetime:
+    if bucket == "hour":
+        return start + timedelta(hours=1)
+    if bucket == "day":
+        return start + timedelta(days=1)
+    if bucket == "week":
+        return start + timedelta(weeks=1)
+    if bucket == "month":
+        return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start.replace(year=start.year + 1)
+
+
+def bucket_count(first: datetime, last: datetime, bucket: str) -> int:
+    """
+    Number of buckets from first to last inclusive (both bucket starts)
+    """
+    if bucket == "month":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    if bucket == "year":
+        return last.year - first.year + 1
+    step = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}[bucket]
+    return (last - first) // step + 1
+
+
+def prepare_external_record(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map one record from the external API onto Earthquake column names
+    The external id becomes earthquake_id when it is an integer
+    """
+    # Make a copy to avoid modifying original data
+    earthquake_data = data.copy()
+    
+    # Get the external API's earthquake ID and convert to integer
+    external_id = earthquake_data.pop("id", None)
+    integer_id = None
+    if external_id:
+        try:
+            integer_id = int(external_id)
+        except (ValueError, TypeError):
+            # Skip non-integer IDs (like "gfz2025xybv")
+            pass
+    
+    # Convert keys to snake_case if they are in camelCase
+    if "createdBy" in earthquake_data:
+        created_by_value = earthquake_data.pop("createdBy")
+        # Convert to integer if possible, otherwise None
+        try:
+            earthquake_data["created_by"] = int(created_by_value) if created_by_value else None
+        except (ValueError, TypeError):
+            earthquake_data["created_by"] = None
+    
+    if "updatedBy" in earthquake_data:
+        updated_by_value = earthquake_data.pop("updatedBy")
+        # Convert to integer if possible, otherwise None
+        try:
+            earthquake_data["updated_by"] = int(updated_by_value) if updated_by_value else None
+        except (ValueError, TypeError):
+            earthquake_data["updated_by"] = None
+    
+    # Remove created_at and updated_at from data if they exist
+    earthquake_data.pop("created_at", None)
+    earthquake_data.pop("updated_at", None)
+    
+    # Set the earthquake_id to integer version or None
+    earthquake_data["earthquake_id"] = integer_id
+    return earthquake_data
+
+
+def duplicate_statements(earthquake_data: Dict[str, Any]) -> list:
+    """
+    Queries that find an existing copy of a prepared external record
+    Method 1: by earthquake_id (if it's an integer)
+    Method 2: by date, time, latitude, longitude, for records with
+    non-integer external IDs
+    """
+    statements = []
+    if earthquake_data.get("earthquake_id"):
+        statements.append(
+            select(Earthquake.id).filter(Earthquake.earthquake_id == earthquake_data["earthquake_id"]).limit(1)
+        )
+    
+    date_val = earthquake_data.get("date")
+    time_val = earthquake_data.get("time")
+    lat_val = earthquake_data.get("latitude")
+    lon_val = earthquake_data.get("longitude")
+    if date_val and time_val and lat_val and lon_val:
+        statements.append(
+            select(Earthquake.id).filter(
+                Earthquake.date == date_val,
+                Earthquake.time == time_val,
+                Earthquake.latitude == lat_val,
+                Earthquake.longitude == lon_val
+            ).limit(1)
+        )
+    return statements
 
 
 class EarthquakeService:
     @staticmethod
-    def get_earthquakes(
-        db: Session, 
-        skip: int = 0, 
-        limit: int = 100,
+    def _apply_filters(
+        query,
         epicenter: Optional[str] = None,
+        epicenter_mode: str = "contains",
         from_date: Optional[str] = None,
         to_date: Optional[str] = None,
         from_magnitude: Optional[float] = None,
         to_magnitude: Optional[float] = None,
-        from_depth: Optional[str] = None,
-        to_depth: Optional[str] = None,
-        from_latitude: Optional[str] = None,
-        to_latitude: Optional[str] = None,
-        from_longitude: Optional[str] = None,
-        to_longitude: Optional[str] = None,
+        from_depth: Optional[float] = None,
+        to_depth: Optional[float] = None,
+        from_latitude: Optional[float] = None,
+        to_latitude: Optional[float] = None,
+        from_longitude: Optional[float] = None,
+        to_longitude: Optional[float] = None,
         from_year: Optional[int] = None,
         to_year: Optional[int] = None,
-        sort: str = "datetime_desc"
     ):
-        query = db.query(Earthquake)
-        
-        if epicenter:
-            query = query.filter(Earthquake.epicenter.ilike(f"%{epicenter}%"))
-        
-        # Convert date from DD.MM.YYYY to YYYY.MM.DD format for proper comparison
-        date_converted_for_filter = func.concat(
-            func.substring(Earthquake.date, 7, 4),  # Year (YYYY)
-            '.',
-            func.substring(Earthquake.date, 4, 2),  # Month (MM)
-            '.',
-            func.substring(Earthquake.date, 1, 2)   # Day (DD)
-        )
+        """
+        Apply the listing filters to a query using the typed, indexed columns
+        """
+        if epicenter and epicenter.strip():
+            query = query.filter(epicenter_condition(epicenter, prefix=epicenter_mode == "prefix"))
         
+        # Dates come in as DD.MM.YYYY; to_date is inclusive of the whole day
         if from_date:
-            # Convert from_date from DD.MM.YYYY to YYYY.MM.DD
-            from_date_parts = from_date.split('.')
-            if len(from_date_parts) == 3:
-                from_date_converted = f"{from_date_parts[2]}.{from_date_parts[1]}.{from_date_parts[0]}"
-                query = query.filter(date_converted_for_filter >= from_date_converted)
+            from_dt = parse_date(from_date)
+            if from_dt is not None:
+                query = query.filter(Earthquake.event_time >= from_dt)
         
         if to_date:
-            # Convert to_date from DD.MM.YYYY to YYYY.MM.DD
-            to_date_parts = to_date.split('.')
-            if len(to_date_parts) == 3:
-                to_date_converted = f"{to_date_parts[2]}.{to_date_parts[1]}.{to_date_parts[0]}"
-                query = query.filter(date_converted_for_filter <= to_date_converted)
+            to_dt = parse_date(to_date)
+            if to_dt is not None:
+                query = query.filter(Earthquake.event_time < to_dt + timedelta(days=1))
         
         if from_magnitude is not None:
             query = query.filter(Earthquake.magnitude >= from_magnitude)
@@ -62,61 +496,188 @@ class EarthquakeService:
             query = query.filter(Earthquake.magnitude <= to_magnitude)
         
         if from_depth is not None:
-            query = query.filter(Earthquake.depth >= from_depth)
+            query = query.filter(Earthquake.depth_km >= from_depth)
         
         if to_depth is not None:
-            query = query.filter(Earthquake.depth <= to_depth)
+            query = query.filter(Earthquake.depth_km <= to_depth)
         
         if from_latitude is not None:
-            query = query.filter(Earthquake.latitude >= from_latitude)
+            query = query.filter(Earthquake.lat >= from_latitude)
         
         if to_latitude is not None:
-            query = query.filter(Earthquake.latitude <= to_latitude)
+            query = query.filter(Earthquake.lat <= to_latitude)
         
         if from_longitude is not None:
-            query = query.filter(Earthquake.longitude >= from_longitude)
+            query = query.filter(Earthquake.lon >= from_longitude)
         
         if to_longitude is not None:
-            query = query.filter(Earthquake.longitude <= to_longitude)
+            query = query.filter(Earthquake.lon <= to_longitude)
         
-        # Year filter - extract year from date field (DD.MM.YYYY format)
+        # Year filters become half-open event_time ranges so they hit the index
         if from_year is not None:
-            year_from_date = func.substring(Earthquake.date, 7, 4)
-            query = query.filter(func.cast(year_from_date, Integer) >= from_year)
+            query = query.filter(Earthquake.event_time >= datetime(from_year, 1, 1))
         
         if to_year is not None:
-            year_from_date = func.substring(Earthquake.date, 7, 4)
-            query = query.filter(func.cast(year_from_date, Integer) <= to_year)
-        
-        total = query.count()
+            query = query.filter(Earthquake.event_time < datetime(to_year + 1, 1, 1))
         
-        # Convert date from DD.MM.YYYY to YYYY-MM-DD format for proper sorting
-        # Using PostgreSQL string functions: substring and concatenation
-        date_converted = func.concat(
-            func.substring(Earthquake.date, 7, 4),  # Year (YYYY)
-            '.',
-            func.substring(Earthquake.date, 4, 2),  # Month (MM)
-            '.',
-            func.substring(Earthquake.date, 1, 2)   # Day (DD)
+        return query
+
+    @staticmethod
+    def _listing_statement(fields: Optional[List[str]] = None):
+        """
+        Full ORM rows, or only the requested columns when projecting
+        The cursor position columns are always selected under private labels
+        """
+        if fields is None:
+            return select(Earthquake)
+        return select(
+            *[RESPONSE_COLUMNS[name].label(name) for name in fields],
+            Earthquake.id.label("_id"),
+            Earthquake.event_time.label("_event_time")
         )
-        
-        # Apply sorting based on sort parameter
+
+    @staticmethod
+    def _apply_sort(query, sort: str, epicenter: Optional[str] = None):
+        """
+        Order by (event_time, id); events without a parsed date go last in
+        both directions, id breaks ties so the order is total.
+        sort=relevance ranks by epicenter similarity when searching.
+        """
+        if sort == "relevance" and epicenter and epicenter.strip():
+            return query.order_by(
+                epicenter_relevance(epicenter).desc(),
+                Earthquake.event_time.desc().nullslast(),
+                Earthquake.id.desc()
+            )
         if sort == "datetime_asc":
-            query = query.order_by(date_converted.asc(), Earthquake.time.asc())
-        else:  # datetime_desc (default)
-            query = query.order_by(date_converted.desc(), Earthquake.time.desc())
-        
-        earthquakes = query.offset(skip).limit(limit).all()
+            return query.order_by(Earthquake.event_time.asc().nullslast(), Earthquake.id.asc())
+        # datetime_desc (default)
+        return query.order_by(Earthquake.event_time.desc().nullslast(), Earthquake.id.desc())
+
+    @staticmethod
+    def _cursor_dated_statement(base, position: Optional[Dict[str, Any]], sort: str, limit: int):
+        """
+        Dated events after the cursor, walking the (event_time, id) index
+        Returns None once the cursor has moved into the undated tail
+        """
+        if position is not None and position["t"] is None:
+            return None
+        stmt = base.filter(Earthquake.event_time.isnot(None))
+        if position is not None:
+            key = tuple_(Earthquake.event_time, Earthquake.id)
+            after = tuple_(position["t"], position["i"])
+            stmt = stmt.filter(key > after if sort == "datetime_asc" else key < after)
+        return EarthquakeService._apply_sort(stmt, sort).limit(limit + 1)
+
+    @staticmethod
+    def _cursor_tail_statement(base, position: Optional[Dict[str, Any]], sort: str, limit: int):
+        """
+        Events without a parsed date, paged by id after all dated events
+        """
+        ascending = sort == "datetime_asc"
+        stmt = base.filter(Earthquake.event_time.is_(None))
+        if position is not None and position["t"] is None:
+            stmt = stmt.filter(Earthquake.id > position["i"] if ascending else Earthquake.id < position["i"])
+        return stmt.order_by(Earthquake.id.asc() if ascending else Earthquake.id.desc()).limit(limit)
+
+    @staticmethod
+    def _cursor_page(rows, limit: int, sort: str, fields: Optional[List[str]] = None):
+        """
+        Trim the limit + 1 lookahead row and build next_cursor from the last row kept
+        Returns: (earthquakes, next_cursor)
+        """
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(*_row_position(rows[-1]), sort)
+        if fields is not None:
+            rows = rows_to_dicts(rows)
+        return rows, next_cursor
+
+    @staticmethod
+    def get_earthquakes_near(
+        db: Session,
+        lat: float,
+        lon: float,
+        radius_km: Optional[float] = None,
+        limit: int = 100,
+        **filters
+    ):
+        """
+        Earthquakes around a point, nearest first
+        With radius_km: every event within that distance (up to limit).
+        Without: the limit nearest events (k-nearest neighbours). The GiST
+        index returns the limit nearest in plain degrees; the farthest of
+        those by haversine bounds the true k nearest, which one radius
+        search then finds exactly.
+        Accepts the same filters as get_earthquakes.
+        Returns: list of (earthquake, distance_km)
+        """
+        distance = haversine_expression(lat, lon).label("distance_km")
+        base = EarthquakeService._apply_filters(db.query(Earthquake, distance), **filters)
+        
+        def within(radius: float):
+            query = base.filter(within_box(*bounding_box(lat, lon, radius)), distance <= radius)
+            return query.order_by(distance.asc(), Earthquake.id.asc()).limit(limit).all()
+        
+        if radius_km is None:
+            candidates = base.filter(Earthquake.lat.isnot(None), Earthquake.lon.isnot(None)).order_by(
+                planar_distance(lat, lon)
+            ).limit(limit).all()
+            if len(candidates) < limit:
+                # Fewer matches than asked for: all of them, ranked by distance
+                candidates.sort(key=lambda row: (row[1], row[0].id))
+                return [(row[0], row[1]) for row in candidates]
+            # 1 mm of slack so rounding in the box test cannot drop the k-th event
+            radius_km = max(row[1] for row in candidates) + 1e-6
+        
+        return [(row[0], row[1]) for row in within(radius_km)]
+
+    @staticmethod
+    def search_epicenters(db: Session, q: str, prefix: bool = False, limit: int = 10):
+        """
+        Autocomplete place names across uz/ru/en epicenter columns
+        Ranked by trigram word similarity, then by number of events
+        Returns: [{"name": "Tashkent", "language": "en", "count": 12, "score": 0.83}, ...]
+        """
+        term = q.strip()
+        if not term:
+            return []
+        pattern = _like_pattern(term, prefix)
+        
+        legs = []
+        for language, column in EPICENTER_COLUMNS:
+            legs.append(
+                db.query(
+                    column.label("name"),
+                    literal(language).label("language"),
+                    func.count(Earthquake.id).label("count"),
+                    func.word_similarity(term, column).label("score")
+                ).filter(column.ilike(pattern, escape="\\")).group_by(column).statement
+            )
+        matches = union_all(*legs).subquery()
+        
+        results = db.query(matches).order_by(
+            matches.c.score.desc(),
+            matches.c.count.desc(),
+            matches.c.name.asc()
+        ).limit(limit).all()
         
-        return earthquakes, total
+        return [{
+            "name": row.name,
+            "language": row.language,
+            "count": row.count,
+            "score": round(float(row.score), 3) if row.score is not None else 0
+        } for row in results]
 
     @staticmethod
-    def get_all_earthquakes_simple(db: Session):
+    def get_all_earthquakes_simple(db: Session, fields: Optional[List[str]] = None):
         """
         Get all earthquakes without any filters or pagination
-        Returns: List of all earthquakes
+        With fields, only those columns are selected
+        Returns: List of all earthquakes as dicts (see fetch_dicts)
         """
-        return db.query(Earthquake).all()
+        return fetch_dicts(db, RESPONSE_COLUMNS, fields or list(RESPONSE_COLUMNS))
 
     @staticmethod
     def get_earthquake(db: Session, earthquake_id: int):
@@ -130,8 +691,12 @@ class EarthquakeService:
             created_at=now,
             updated_at=now
         )
+        apply_typed_columns(db_earthquake)
         db.add(db_earthquake)
+        db.flush()
+        RollupService.refresh_months(db, [month_of(db_earthquake.event_time)])
         db.commit()
+        bump_data_version()
         db.refresh(db_earthquake)
         return db_earthquake
 
@@ -141,11 +706,16 @@ class EarthquakeService:
         if db_earthquake:
             update_data = earthquake.dict(exclude_unset=True)
             update_data["updated_at"] = datetime.now()
+            old_month = month_of(db_earthquake.event_time)
             
             for key, value in update_data.items():
                 setattr(db_earthquake, key, value)
+            apply_typed_columns(db_earthquake)
             
+            db.flush()
+            RollupService.refresh_months(db, [old_month, month_of(db_earthquake.event_time)])
             db.commit()
+            bump_data_version()
             db.refresh(db_earthquake)
         return db_earthquake
 
@@ -153,134 +723,27 @@ class EarthquakeService:
     def delete_earthquake(db: Session, earthquake_id: int):
         db_earthquake = db.query(Earthquake).filter(Earthquake.id == earthquake_id).first()
         if db_earthquake:
+            old_month = month_of(db_earthquake.event_time)
             db.delete(db_earthquake)
+            db.flush()
+            RollupService.refresh_months(db, [old_month])
             db.commit()
+            bump_data_version()
             return True
         return False
 
-    @staticmethod
-    def bulk_create_earthquakes(db: Session, earthquakes_data: List[Dict[str, Any]]):
-        now = datetime.now()
-        earthquakes = []
-        skipped = 0
-        
-        for data in earthquakes_data:
-            try:
-                # Make a copy to avoid modifying original data
-                earthquake_data = data.copy()
-                
-                # Get the external API's earthquake ID and convert to integer
-                external_id = earthquake_data.get("id")
-                integer_id = None
-                
-                # Try to convert to integer
-                if external_id:
-                    try:
-                        integer_id = int(external_id)
-                    except (ValueError, TypeError):
-                        # Skip non-integer IDs (like "gfz2025xybv")
-                        pass
-                
-                # Check if earthquake already exists
-                # Method 1: Check by earthquake_id (if it's an integer)
-                if integer_id:
-                    existing = db.query(Earthquake).filter(Earthquake.earthquake_id == integer_id).first()
-                    if existing:
-                        skipped += 1
-                        continue
-                
-                # Method 2: Check by date, time, latitude, longitude (for records without earthquake_id)
-                # This prevents duplicates for records with non-integer IDs
-                date_val = earthquake_data.get("date")
-                time_val = earthquake_data.get("time")
-                lat_val = earthquake_data.get("latitude")
-                lon_val = earthquake_data.get("longitude")
-                
-                if date_val and time_val and lat_val and lon_val:
-                    existing_by_location = db.query(Earthquake).filter(
-                        Earthquake.date == date_val,
-                        Earthquake.time == time_val,
-                        Earthquake.latitude == lat_val,
-                        Earthquake.longitude == lon_val
-                    ).first()
-                    if existing_by_location:
-                        skipped += 1
-                        continue
-                
-                # Remove the original id field
-                earthquake_data.pop("id", None)
-                
-                # Convert keys to snake_case if they are in camelCase
-                if "createdBy" in earthquake_data:
-                    created_by_value = earthquake_data.pop("createdBy")
-                    # Convert to integer if possible, otherwise None
-                    try:
-                        earthquake_data["created_by"] = int(created_by_value) if created_by_value else None
-                    except (ValueError, TypeError):
-                        earthquake_data["created_by"] = None
-                        
-                if "updatedBy" in earthquake_data:
-                    updated_by_value = earthquake_data.pop("updatedBy")
-                    # Convert to integer if possible, otherwise None
-                    try:
-                        earthquake_data["updated_by"] = int(updated_by_value) if updated_by_value else None
-                    except (ValueError, TypeError):
-                        earthquake_data["updated_by"] = None
-                
-                # Remove created_at and updated_at from data if they exist
-                earthquake_data.pop("created_at", None)
-                earthquake_data.pop("updated_at", None)
-                
-                # Set the earthquake_id to integer version or None
-                earthquake_data["earthquake_id"] = integer_id
-                    
-                # Create earthquake object
-                earthquake = Earthquake(
-                    **earthquake_data,
-                    created_at=now,
-                    updated_at=now
-                )
-                earthquakes.append(earthquake)
-                
-            except Exception as e:
-                # Skip problematic records and continue
-                print(f"Skipping earthquake due to error: {e}")
-                skipped += 1
-                continue
-        
-        # Insert earthquakes one by one to handle errors individually
-        inserted = []
-        for earthquake in earthquakes:
-            try:
-                db.add(earthquake)
-                db.flush()  # Flush to catch errors immediately
-                inserted.append(earthquake)
-            except Exception as e:
-                db.rollback()
-                print(f"Failed to insert earthquake: {e}")
-                skipped += 1
-        
-        # Commit all successful inserts
-        if inserted:
-            db.commit()
-        
-        return inserted, skipped
-
     @staticmethod
     def get_earthquakes_by_year(db: Session):
         """
         Get earthquake count grouped by year
         Returns list of {year: str, count: int} ordered by year desc
         """
-        # Extract year from date field (DD.MM.YYYY format, year is at position 7-10)
-        year_expr = func.substring(Earthquake.date, 7, 4)
-        
         results = db.query(
-            year_expr.label('year'),
-            func.count(Earthquake.id).label('count')
-        ).group_by(year_expr).order_by(year_expr.desc()).all()
+            EarthquakeMonthlyStats.year.label('year'),
+            func.sum(EarthquakeMonthlyStats.count).label('count')
+        ).group_by(EarthquakeMonthlyStats.year).order_by(EarthquakeMonthlyStats.year.desc()).all()
         
-        return [{"year": row.year, "count": row.count} for row in results]
+        return [{"year": f"{row.year:04d}", "count": int(row.count)} for row in results]
 
     @staticmethod
     def get_earthquakes_by_month(db: Session, year: Optional[int] = None):
@@ -289,26 +752,13 @@ class EarthquakeService:
         If year is provided, filter by that year
         Returns list of {year: str, month: str, count: int} ordered by year desc, month desc
         """
-        # Extract year and month from date field (DD.MM.YYYY format)
-        year_expr = func.substring(Earthquake.date, 7, 4)
-        month_expr = func.substring(Earthquake.date, 4, 2)
+        months = RollupService.get_months(db, from_year=year, to_year=year)
         
-        query = db.query(
-            year_expr.label('year'),
-            month_expr.label('month'),
-            func.count(Earthquake.id).label('count')
-        )
-        
-        # Filter by year if provided
-        if year is not None:
-            query = query.filter(func.cast(year_expr, Integer) == year)
-        
-        results = query.group_by(year_expr, month_expr).order_by(
-            year_expr.desc(), 
-            month_expr.desc()
-        ).all()
-        
-        return [{"year": row.year, "month": row.month, "count": row.count} for row in results]
+        return [{
+            "year": f"{row.year:04d}",
+            "month": f"{row.month:02d}",
+            "count": row.count
+        } for row in reversed(months)]
 
     @staticmethod
     def get_magnitude_statistics_by_month(db: Session, from_year: Optional[int] = None, to_year: Optional[int] = None):
@@ -317,35 +767,14 @@ class EarthquakeService:
         Returns data suitable for multi-line chart with years as separate lines
         Format: [{"year": "2023", "month": "01", "max_magnitude": 4.5, "count": 10}, ...]
         """
-        # Extract year and month from date field (DD.MM.YYYY format)
-        year_expr = func.substring(Earthquake.date, 7, 4)
-        month_expr = func.substring(Earthquake.date, 4, 2)
-        
-        query = db.query(
-            year_expr.label('year'),
-            month_expr.label('month'),
-            func.max(Earthquake.magnitude).label('max_magnitude'),
-            func.count(Earthquake.id).label('count')
-        )
-        
-        # Filter by year range if provided
-        if from_year is not None:
-            query = query.filter(func.cast(year_expr, Integer) >= from_year)
-        
-        if to_year is not None:
-            query = query.filter(func.cast(year_expr, Integer) <= to_year)
-        
-        results = query.group_by(year_expr, month_expr).order_by(
-            year_expr.asc(), 
-            month_expr.asc()
-        ).all()
+        months = RollupService.get_months(db, from_year=from_year, to_year=to_year)
         
         return [{
-            "year": row.year, 
-            "month": row.month, 
+            "year": f"{row.year:04d}",
+            "month": f"{row.month:02d}",
             "max_magnitude": round(float(row.max_magnitude), 2) if row.max_magnitude else 0,
             "count": row.count
-        } for row in results]
+        } for row in months]
 
     @staticmethod
     def get_count_statistics_by_month(db: Session, from_year: Optional[int] = None, to_year: Optional[int] = None):
@@ -354,95 +783,130 @@ class EarthquakeService:
         Returns data suitable for multi-line chart with years as separate lines
         Format: [{"year": "2023", "month": "01", "count": 25}, ...]
         """
-        # Extract year and month from date field (DD.MM.YYYY format)
-        year_expr = func.substring(Earthquake.date, 7, 4)
-        month_expr = func.substring(Earthquake.date, 4, 2)
-        
-        query = db.query(
-            year_expr.label('year'),
-            month_expr.label('month'),
-            func.count(Earthquake.id).label('count')
-        )
-        
-        # Filter by year range if provided
-        if from_year is not None:
-            query = query.filter(func.cast(year_expr, Integer) >= from_year)
-        
-        if to_year is not None:
-            query = query.filter(func.cast(year_expr, Integer) <= to_year)
-        
-        results = query.group_by(year_expr, month_expr).order_by(
-            year_expr.asc(), 
-            month_expr.asc()
-        ).all()
+        months = RollupService.get_months(db, from_year=from_year, to_year=to_year)
         
         return [{
-            "year": row.year, 
-            "month": row.month, 
+            "year": f"{row.year:04d}",
+            "month": f"{row.month:02d}",
             "count": row.count
-        } for row in results]
+        } for row in months]
 
     @staticmethod
-    def get_all_coordinates(db: Session):
+    def get_statistics_summary(db: Session, from_year: Optional[int] = None, to_year: Optional[int] = None):
         """
-        Get all earthquake coordinates with metadata for shapefile/GIS export
-        Returns: List of all earthquakes with coordinates and key attributes
+        All dashboard statistics from a single read of the monthly rollup
+        Returns the payloads of by-year, by-month, magnitude-by-month and
+        count-by-month for the year range, plus per-year max magnitude
         """
-        earthquakes = db.query(Earthquake).all()
+        months = RollupService.get_months(db, from_year=from_year, to_year=to_year)
+        
+        years = {}
+        count_by_month = []
+        magnitude_by_month = []
+        for row in months:
+            year = f"{row.year:04d}"
+            month = f"{row.month:02d}"
+            max_magnitude = round(float(row.max_magnitude), 2) if row.max_magnitude else 0
+            
+            count_by_month.append({"year": year, "month": month, "count": row.count})
+            magnitude_by_month.append({
+                "year": year,
+                "month": month,
+                "max_magnitude": max_magnitude,
+                "count": row.count
+            })
+            
+            totals = years.setdefault(year, {"year": year, "count": 0, "max_magnitude": 0})
+            totals["count"] += row.count
+            totals["max_magnitude"] = max(totals["max_magnitude"], max_magnitude)
         
-        return [{
-            "id": eq.id,
-            "latitude": float(eq.latitude) if eq.latitude else None,
-            "longitude": float(eq.longitude) if eq.longitude else None,
-            "magnitude": float(eq.magnitude) if eq.magnitude else None,
-            "depth": float(eq.depth) if eq.depth else None,
-            "date": eq.date,
-            "time": eq.time,
-            "epicenter": eq.epicenter,
-            "earthquake_id": eq.earthquake_id
-        } for eq in earthquakes]
+        return {
+            "from_year": from_year,
+            "to_year": to_year,
+            "by_year": sorted(years.values(), key=lambda item: item["year"], reverse=True),
+            "by_month": list(reversed(count_by_month)),
+            "magnitude_by_month": magnitude_by_month,
+            "count_by_month": count_by_month
+        }
 
     @staticmethod
-    def get_geojson_coordinates(db: Session):
+    def get_time_series(db: Session, bucket: str = "day", **filters):
         """
-        Get all earthquake coordinates in GeoJSON format for shapefile export
-        GeoJSON can be easily converted to shapefile using QGIS, ArcGIS, or ogr2ogr
+        Event count and max magnitude per hour/day/week/month/year bucket
+        Buckets between the range ends are zero-filled. The range is
+        from_date/to_date (or from_year/to_year); without them it spans
+        the first to the last matching event.
+        Raises ValueError if the series would exceed MAX_TIME_SERIES_BUCKETS
+        Returns: {"bucket", "from", "to", "series": [{"time", "count", "max_magnitude"}]}
         """
-        earthquakes = db.query(Earthquake).all()
-        
-        features = []
-        for eq in earthquakes:
-            # Skip if no coordinates
-            if not eq.latitude or not eq.longitude:
-                continue
-                
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [
-                        float(eq.longitude),  # longitude first in GeoJSON
-                        float(eq.latitude)    # latitude second
-                    ]
-                },
-                "properties": {
-                    "id": eq.id,
-                    "earthquake_id": eq.earthquake_id,
-                    "date": eq.date,
-                    "time": eq.time,
-                    "magnitude": float(eq.magnitude) if eq.magnitude else None,
-                    "depth": float(eq.depth) if eq.depth else None,
-                    "epicenter": eq.epicenter,
-                    "epicenter_ru": eq.epicenter_ru,
-                    "epicenter_en": eq.epicenter_en,
-                    "magnitude_type": eq.magnitude_type,
-                    "color": eq.color,
-                    "is_perceptabily": eq.is_perceptabily
-                }
-            }
-            features.append(feature)
-        
-        return {
-            "type": "FeatureCollection",
-            "features": features
-        }
+        start = parse_date(filters.get("from_date"))
+        if start is None and filters.get("from_year") is not None:
+            start = datetime(filters["from_year"], 1, 1)
+        end = parse_date(filters.get("to_date"))
+        if end is None and filters.get("to_year") is not None:
+            end = datetime(filters["to_year"], 12, 31)
+        
+        first = truncate_time(start, bucket) if start else None
+        last = truncate_time(end, bucket) if end else None
+        if first and last and bucket_count(first, last, bucket) > MAX_TIME_SERIES_BUCKETS:
+            raise ValueError(f"Range has more than {MAX_TIME_SERIES_BUCKETS} {bucket} buckets, use a larger bucket")
+        
+        only_years = not any(
+            value is not None for key, value in filters.items() if key not in ("from_year", "to_year", "epicenter_mode")
+        )
+        if bucket in ("month", "year") and only_years:
+            # Whole months: answered from the rollup without touching earthquakes
+            months = RollupService.get_months(db, from_year=filters.get("from_year"), to_year=filters.get("to_year"))
+            rows = {}
+            for row in months:
+                key = datetime(row.year, row.month if bucket == "month" else 1, 1)
+                count, magnitude = rows.get(key, (0, None))
+                if row.max_magnitude is not None:
+                    magnitude = row.max_magnitude if magnitude is None else max(magnitude, row.max_magnitude)
+                rows[key] = (count + row.count, magnitude)
+        else:
+            # date_trunc over an event_time range scan; NULL event_time rows are excluded
+            time_bucket = func.date_trunc(bucket, Earthquake.event_time).label("bucket")
+            stmt = select(
+                time_bucket,
+                func.count(Earthquake.id).label("count"),
+                func.max(Earthquake.magnitude).label("max_magnitude")
+            ).where(Earthquake.event_time.isnot(None))
+            stmt = EarthquakeService._apply_filters(stmt, **filters).group_by(time_bucket)
+            rows = {row.bucket: (row.count, row.max_magnitude) for row in db.execute(stmt)}
+        
+        if rows:
+            first = first or min(rows)
+            last = last or max(rows)
+        if first is None or last is None:
+            return {"bucket": bucket, "from": None, "to": None, "series": []}
+        if bucket_count(first, last, bucket) > MAX_TIME_SERIES_BUCKETS:
+            raise ValueError(f"Range has more than {MAX_TIME_SERIES_BUCKETS} {bucket} buckets, use a larger bucket")
+        
+        series = []
+        current = first
+        while current <= last:
+            count, magnitude = rows.get(current, (0, None))
+            series.append({
+                "time": current.isoformat(),
+                "count": count,
+                "max_magnitude": round(float(magnitude), 2) if magnitude is not None else None
+            })
+            current = next_bucket(current, bucket)
+        
+        return {"bucket": bucket, "from": first.isoformat(), "to": last.isoformat(), "series": series}
+
+    @staticmethod
+    def get_all_coordinates(db: Session, fields: Optional[List[str]] = None, **filters):
+        """
+        Get all earthquake coordinates with metadata for shapefile/GIS export
+        With fields, only those columns are selected (see COORDINATE_COLUMNS)
+        filters are the listing filters (see _apply_filters)
+        Returns: List of all earthquakes with coordinates and key attributes
+        """
+        return fetch_dicts(
+            db,
+            COORDINATE_COLUMNS,
+            fields or list(COORDINATE_COLUMNS),
+            lambda stmt: EarthquakeService._apply_filters(stmt, **filters)
+        )
@@ -0,0 +1,160 @@
+"""
+Prebuilt export artifacts
+The full-catalog downloads are written to EXPORT_CACHE_DIR once per data
+version, so a download is a plain file response. After each sync that
+inserted rows (or the first download that finds no artifact for the
+current version) a background thread rebuilds the missing artifacts;
+until it finishes, downloads fall back to streaming from the database.
+
+Text artifacts (GeoJSON) also get gzip / brotli variants next to them,
+so compressed downloads are plain file responses too.
+
+Artifacts are built from the primary: they are labelled with the current
+data version, which a lagging replica may not have reached yet.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, Iterator, NamedTuple, Optional
+
+from app.db.database import SessionLocal
+from app.services.content_coding import FILE_EXTENSIONS, compress_file, supported_encodings
+from app.services.data_version import get_data_version
+from app.services.export_service import iter_geojson, iter_shapefile_zip
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "earthquake_exports"))
+
+
+class Artifact(NamedTuple):
+    filename: str
+    media_type: str
+    build: Callable[[], Iterator[bytes]]
+    precompress: bool = False
+
+
+ARTIFACTS: Dict[str, Artifact] = {
+    "geojson": Artifact(
+        "earthquakes.geojson",
+        "application/geo+json",
+        lambda: iter_geojson(session_factory=SessionLocal),
+        precompress=True,
+    ),
+    "shapefile": Artifact(
+        "earthquakes_shapefile.zip",
+        "application/zip",
+        lambda: iter_shapefile_zip(session_factory=SessionLocal),
+    ),
+}
+
+_refresh_lock = threading.Lock()
+_refresh_thread: Optional[threading.Thread] = None
+
+
+def artifact_path(name: str, version: int) -> str:
+    return os.path.join(EXPORT_CACHE_DIR, f"{version}-{ARTIFACTS[name].filename}")
+
+
+def get_artifact(name: str, encoding: Optional[str] = None) -> Optional[str]:
+    """
+    Path of the artifact (or of its gzip / br variant) for the current data
+    version, or None if not built yet
+    """
+    path = artifact_path(name, get_data_version())
+    if encoding is not None:
+        path += FILE_EXTENSIONS[encoding]
+    return path if os.path.exists(path) else None
+
+
+def _write_atomically(path: str, write: Callable[[str], None]) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=EXPORT_CACHE_DIR, prefix=".building-")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_chunks(chunks: Iterator[bytes]) -> Callable[[str], None]:
+    def write(tmp_path: str) -> None:
+        with open(tmp_path, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+    return write
+
+
+def build_artifact(name: str, version: int) -> str:
+    """
+    Write the artifact to a temporary file and move it into place, so a
+    half-written file is never served
+    """
+    os.makedirs(EXPORT_CACHE_DIR, exist_ok=True)
+    path = artifact_path(name, version)
+    _write_atomically(path, _write_chunks(ARTIFACTS[name].build()))
+    if ARTIFACTS[name].precompress:
+        for encoding in supported_encodings():
+            _write_atomically(
+                path + FILE_EXTENSIONS[encoding],
+                lambda tmp_path: compress_file(path, tmp_path, encoding)
+            )
+    return path
+
+
+def _remove_stale() -> None:
+    # The two newest versions stay: the previous one may still be downloading
+    files = [entry for entry in os.scandir(EXPORT_CACHE_DIR) if entry.is_file() and entry.name[:1].isdigit()]
+    versions = sorted({int(entry.name.split("-", 1)[0]) for entry in files}, reverse=True)
+    for entry in files:
+        if int(entry.name.split("-", 1)[0]) not in versions[:2]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+def refresh_artifacts() -> None:
+    """
+    Build every artifact missing for the current data version, repeating
+    while writes keep bumping the version
+    """
+    previous = None
+    while True:
+        version = get_data_version()
+        if version == previous:
+            return
+        for name in ARTIFACTS:
+            if not os.path.exists(artifact_path(name, version)):
+                try:
+                    build_artifact(name, version)
+                    logger.info(f"📦 Built {name} export for data version {version}")
+                except Exception as e:
+                    logger.error(f"❌ Failed to build {name} export: {str(e)}")
+                    return
+        _remove_stale()
+        previous = version
+
+
+def _refresh_worker() -> None:
+    global _refresh_thread
+    try:
+        refresh_artifacts()
+    finally:
+        with _refresh_lock:
+            _refresh_thread = None
+
+
+def schedule_refresh() -> None:
+    """
+    Rebuild the artifacts in a background thread unless one is already running
+    """
+    global _refresh_thread
+    with _refresh_lock:
+        if _refresh_thread is not None:
+            return
+        _refresh_thread = threading.Thread(target=_refresh_worker, name="export-refresh", daemon=True)
+        _refresh_thread.start()
@@ -0,0 +1,140 @@
+"""
+Background export jobs
+Large filtered exports run on a small thread pool instead of holding an
+HTTP worker: the client starts a job, polls its progress and downloads the
+file once it is done. Jobs and their files are kept in memory / on disk
+for EXPORT_JOB_TTL_SECONDS after they finish.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.db.routing import read_session_factory
+from app.services.export_cache import EXPORT_CACHE_DIR
+from app.services.export_service import export_count_statement, iter_geojson, iter_shapefile_zip
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "2"))
+EXPORT_JOB_TTL_SECONDS = int(os.getenv("EXPORT_JOB_TTL_SECONDS", "3600"))
+EXPORT_JOBS_DIR = os.path.join(EXPORT_CACHE_DIR, "jobs")
+
+# format -> (file name, media type, export generator, passes over the rows)
+EXPORT_FORMATS = {
+    "geojson": ("earthquakes.geojson", "application/geo+json", iter_geojson, 1),
+    "shapefile": ("earthquakes_shapefile.zip", "application/zip", iter_shapefile_zip, 2),
+}
+
+_executor = ThreadPoolExecutor(max_workers=EXPORT_JOB_WORKERS, thread_name_prefix="export-job")
+_lock = threading.Lock()
+_jobs: Dict[str, Dict[str, Any]] = {}
+
+
+def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in job.items() if not key.startswith("_")}
+
+
+def _expire_jobs() -> None:
+    now = time.monotonic()
+    with _lock:
+        expired = [job for job in _jobs.values() if job["_expires_at"] is not None and job["_expires_at"] <= now]
+        for job in expired:
+            del _jobs[job["id"]]
+    for job in expired:
+        if job["_path"] and os.path.exists(job["_path"]):
+            os.unlink(job["_path"])
+
+
+def _run(job_id: str) -> None:
+    job = _jobs[job_id]
+    filename, _, export, passes = EXPORT_FORMATS[job["format"]]
+    filters = job["_filters"]
+    path = os.path.join(EXPORT_JOBS_DIR, f"{job_id}-{filename}")
+    tmp_path = path + ".part"
+    try:
+        job["status"] = "running"
+        with read_session_factory()() as db:
+            job["total_rows"] = db.execute(export_count_statement(filters)).scalar() or 0
+        work = max(job["total_rows"] * passes, 1)
+        done = 0
+
+        def on_rows(count: int):
+            nonlocal done
+            done += count
+            job["progress"] = min(round(100 * done / work, 1), 99.9)
+
+        os.makedirs(EXPORT_JOBS_DIR, exist_ok=True)
+        with open(tmp_path, "wb") as file:
+            for chunk in export(filters, on_rows=on_rows):
+                file.write(chunk)
+        os.replace(tmp_path, path)
+
+        job["_path"] = path
+        job["size_bytes"] = os.path.getsize(path)
+        job["progress"] = 100.0
+        job["status"] = "done"
+        logger.info(f"✅ Export job {job_id} finished: {job['total_rows']} rows, {job['size_bytes']} bytes")
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        job["status"] = "failed"
+        job["error"] = str(e)
+        logger.error(f"❌ Export job {job_id} failed: {str(e)}")
+    finally:
+        job["finished_at"] = datetime.now().isoformat()
+        job["_expires_at"] = time.monotonic() + EXPORT_JOB_TTL_SECONDS
+
+
+def start_export_job(export_format: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Queue an export of the earthquakes matching filters
+    Returns: the job status (see get_export_job)
+    """
+    _expire_jobs()
+    job_id = uuid.uuid4().hex
+    job = {
+        "id": job_id,
+        "format": export_format,
+        "status": "pending",
+        "progress": 0.0,
+        "total_rows": None,
+        "size_bytes": None,
+        "error": None,
+        "created_at": datetime.now().isoformat(),
+        "finished_at": None,
+        "_filters": filters,
+        "_path": None,
+        "_expires_at": None,
+    }
+    with _lock:
+        _jobs[job_id] = job
+    _executor.submit(_run, job_id)
+    return _public(job)
+
+
+def get_export_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns: {"id", "format", "status" (pending/running/done/failed),
+    "progress" (percent), "total_rows", "size_bytes", "error", ...}
+    or None for an unknown or expired job
+    """
+    _expire_jobs()
+    job = _jobs.get(job_id)
+    return _public(job) if job else None
+
+
+def get_export_file(job_id: str) -> Optional[tuple]:
+    """
+    Returns: (path, file name, media type) of a finished job, else None
+    """
+    job = _jobs.get(job_id)
+    if not job or job["status"] != "done":
+        return None
+    filename, media_type, _, _ = EXPORT_FORMATS[job["format"]]
+    return job["_path"], filename, media_type
@@ -0,0 +1,345 @@
+"""
+Streaming exports
+Export rows are read through a server-side cursor (stream_results) in
+chunks of EXPORT_CHUNK_SIZE and encoded as they arrive, so memory stays
+flat and the first bytes go out before the query has finished.
+
+The generators open their own session: a StreamingResponse keeps
+iterating after the endpoint has returned, and the session has to live
+exactly as long as the stream.
+
+The shapefile needs its record count and bounding box up front and reads
+the rows twice (.shp, then .dbf), so it runs in one REPEATABLE READ
+transaction where the pre-query and both passes see the same snapshot.
+"""
+
+import zipfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.routing import read_session_factory
+from app.models.earthquake import Earthquake
+from app.services.earthquake_service import LEAN_FETCH_BATCH_SIZE, RESPONSE_COLUMNS, EarthquakeService
+from app.services.shapefile import (
+    DBF_END,
+    WGS84_PRJ,
+    DbfField,
+    dbf_header,
+    dbf_records,
+    iter_shx,
+    shp_header,
+    shp_records,
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+# orjson options for RESPONSE_COLUMNS rows: aware datetimes in UTC end in
+# "Z", as pydantic renders created_at / updated_at on the model responses
+ROW_JSON_OPTIONS = orjson.OPT_UTC_Z
+
+GEOJSON_COLUMNS = (
+    Earthquake.id,
+    Earthquake.lon,
+    Earthquake.lat,
+    Earthquake.earthquake_id,
+    Earthquake.date,
+    Earthquake.time,
+    Earthquake.magnitude,
+    Earthquake.depth_km,
+    Earthquake.epicenter,
+    Earthquake.epicenter_ru,
+    Earthquake.epicenter_en,
+    Earthquake.magnitude_type,
+    Earthquake.color,
+    Earthquake.is_perceptabily,
+)
+
+SHAPEFILE_FIELDS = (
+    DbfField("ID", "N", 10),
+    DbfField("EQ_ID", "N", 10),
+    DbfField("DATE", "C", 10),
+    DbfField("TIME", "C", 12),
+    DbfField("MAGNITUDE", "N", 6, 2),
+    DbfField("DEPTH", "N", 10, 3),
+    DbfField("EPICENTER", "C", 254),
+    DbfField("EPIC_RU", "C", 254),
+    DbfField("EPIC_EN", "C", 254),
+    DbfField("MAG_TYPE", "C", 10),
+    DbfField("COLOR", "C", 20),
+    DbfField("PERCEPT", "L", 1),
+)
+
+SHAPEFILE_README = """Earthquake Data - Shapefile Package
+=====================================
+
+This package contains earthquake data as an ESRI Shapefile (point layer).
+
+FILES:
+------
+- earthquakes.shp : Geometry (points)
+- earthquakes.shx : Geometry index
+- earthquakes.dbf : Attributes
+- earthquakes.prj : Coordinate system (WGS84)
+- earthquakes.cpg : Attribute encoding (UTF-8)
+
+HOW TO USE:
+-----------
+
+QGIS: drag and drop 'earthquakes.shp' into QGIS
+ArcGIS Pro: Add Data -> select 'earthquakes.shp'
+
+COORDINATE SYSTEM:
+------------------
+WGS84 (EPSG:4326)
+Coordinates: [longitude, latitude]
+
+ATTRIBUTES:
+-----------
+- ID: Database ID
+- EQ_ID: External earthquake ID
+- DATE: Date (DD.MM.YYYY)
+- TIME: Time (HH:MM:SS)
+- MAGNITUDE: Earthquake magnitude
+- DEPTH: Depth in km
+- EPICENTER, EPIC_RU, EPIC_EN: Epicenter location (uz/ru/en)
+- MAG_TYPE: Type of magnitude
+- COLOR: Color code for visualization
+- PERCEPT: Whether the earthquake was perceptible
+
+Text attributes are UTF-8 and longer values are cut to the field width
+(254 bytes for epicenter names). The full records are available as
+GeoJSON from /earthquakes/download/geojson.
+
+For more information, visit: http://localhost:8005/docs
+"""
+
+FEATURE_COLLECTION_START = b'{"type":"FeatureCollection","features":['
+FEATURE_COLLECTION_END = b"]}"
+
+
+def exported(stmt, filters: Optional[Dict[str, Any]] = None):
+    """
+    Restrict stmt to earthquakes with coordinates matching the listing filters
+    """
+    stmt = stmt.where(Earthquake.lat.isnot(None), Earthquake.lon.isnot(None))
+    if filters:
+        stmt = EarthquakeService._apply_filters(stmt, **filters)
+    return stmt
+
+
+def geojson_statement(filters: Optional[Dict[str, Any]] = None):
+    """
+    Exported columns of every (matching) earthquake with coordinates, in id order
+    """
+    return exported(select(*GEOJSON_COLUMNS), filters).order_by(Earthquake.id)
+
+
+def export_count_statement(filters: Optional[Dict[str, Any]] = None):
+    return exported(select(func.count(Earthquake.id)), filters)
+
+
+def geojson_feature(row) -> Dict[str, Any]:
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [row.lon, row.lat]  # longitude first in GeoJSON
+        },
+        "properties": {
+            "id": row.id,
+            "earthquake_id": row.earthquake_id,
+            "date": row.date,
+            "time": row.time,
+            "magnitude": float(row.magnitude) if row.magnitude else None,
+            "depth": row.depth_km,
+            "epicenter": row.epicenter,
+            "epicenter_ru": row.epicenter_ru,
+            "epicenter_en": row.epicenter_en,
+            "magnitude_type": row.magnitude_type,
+            "color": row.color,
+            "is_perceptabily": row.is_perceptabily
+        }
+    }
+
+
+def shapefile_row(row) -> tuple:
+    # Values in SHAPEFILE_FIELDS order
+    return (
+        row.id,
+        row.earthquake_id,
+        row.date,
+        row.time,
+        row.magnitude,
+        row.depth_km,
+        row.epicenter,
+        row.epicenter_ru,
+        row.epicenter_en,
+        row.magnitude_type,
+        row.color,
+        row.is_perceptabily,
+    )
+
+
+ProgressCallback = Callable[[int], None]
+
+
+def stream_partitions(
+    db: Session, stmt, chunk_size: int = EXPORT_CHUNK_SIZE, on_rows: Optional[ProgressCallback] = None
+) -> Iterator[list]:
+    """
+    Rows of stmt in lists of up to chunk_size, fetched from a server-side cursor
+    on_rows is called with the size of each list, for progress reporting
+    """
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    for rows in result.partitions():
+        yield rows
+        if on_rows:
+            on_rows(len(rows))
+
+
+def iter_row_chunks(
+    stmt, chunk_size: int = EXPORT_CHUNK_SIZE, session_factory=None, on_rows: Optional[ProgressCallback] = None
+) -> Iterator[list]:
+    """
+    stream_partitions in a session of its own, from the read replica
+    unless a session_factory is given
+    """
+    db = (session_factory or read_session_factory())()
+    try:
+        yield from stream_partitions(db, stmt, chunk_size, on_rows)
+    finally:
+        db.close()
+
+
+def iter_geojson(
+    filters: Optional[Dict[str, Any]] = None, session_factory=None, on_rows: Optional[ProgressCallback] = None
+) -> Iterator[bytes]:
+    """
+    Compact GeoJSON FeatureCollection, one chunk of features per item
+    """
+    yield FEATURE_COLLECTION_START
+    separator = b""
+    for rows in iter_row_chunks(geojson_statement(filters), session_factory=session_factory, on_rows=on_rows):
+        yield separator + b",".join(orjson.dumps(geojson_feature(row)) for row in rows)
+        separator = b","
+    yield FEATURE_COLLECTION_END
+
+
+def iter_ndjson(fields: Optional[List[str]] = None, session_factory=None) -> Iterator[bytes]:
+    """
+    Newline-delimited JSON: one earthquake object (RESPONSE_COLUMNS, or
+    just fields) per line, in id order, one chunk of lines per item
+    """
+    names = fields or list(RESPONSE_COLUMNS)
+    stmt = select(*[RESPONSE_COLUMNS[name].label(name) for name in names]).order_by(Earthquake.id)
+    for rows in iter_row_chunks(stmt, chunk_size=LEAN_FETCH_BATCH_SIZE, session_factory=session_factory):
+        yield b"".join(orjson.dumps(dict(zip(names, row)), option=ROW_JSON_OPTIONS | orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+class ChunkBuffer:
+    """
+    Write-only file that hands written bytes back to a generator
+    It reports its position but cannot seek, so ZipFile writes each entry
+    once with a trailing data descriptor instead of patching headers.
+    Also used as the sink of the pyarrow writers in tabular_export.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    # File protocol bits that pyarrow's PythonFile wrapper checks
+    closed = False
+
+    def writable(self) -> bool:
+        return True
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(entries: Iterable[Tuple[str, Iterable[bytes]]]) -> Iterator[bytes]:
+    """
+    Stream a deflated ZIP archive of (name, chunks) entries as it is written
+    """
+    buffer = ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for name, chunks in entries:
+            with zip_file.open(name, "w") as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+    yield buffer.drain()
+
+
+def iter_shapefile_zip(
+    filters: Optional[Dict[str, Any]] = None, session_factory=None, on_rows: Optional[ProgressCallback] = None
+) -> Iterator[bytes]:
+    """
+    Zipped point shapefile (earthquakes.shp/.shx/.dbf/.prj/.cpg) of every
+    (matching) earthquake with coordinates, streamed as it is written
+    on_rows sees every row twice, once per pass
+    """
+    db = (session_factory or read_session_factory())()
+    try:
+        # Must be set before the first statement of the transaction
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        
+        summary = db.execute(exported(
+            select(
+                func.count(Earthquake.id),
+                func.min(Earthquake.lon),
+                func.min(Earthquake.lat),
+                func.max(Earthquake.lon),
+                func.max(Earthquake.lat),
+            ),
+            filters
+        )).one()
+        count = summary[0]
+        bbox = tuple(value if value is not None else 0.0 for value in summary[1:])
+        stmt = geojson_statement(filters)
+        
+        def shp():
+            yield shp_header(count, bbox)
+            number = 1
+            for rows in stream_partitions(db, stmt, on_rows=on_rows):
+                yield shp_records(((row.lon, row.lat) for row in rows), number)
+                number += len(rows)
+        
+        def dbf():
+            yield dbf_header(SHAPEFILE_FIELDS, count)
+            for rows in stream_partitions(db, stmt, on_rows=on_rows):
+                yield dbf_records(SHAPEFILE_FIELDS, (shapefile_row(row) for row in rows))
+            yield DBF_END
+        
+        yield from iter_zip([
+            ("earthquakes.shp", shp()),
+            ("earthquakes.shx", iter_shx(count, bbox)),
+            ("earthquakes.dbf", dbf()),
+            ("earthquakes.prj", [WGS84_PRJ.encode("ascii")]),
+            ("earthquakes.cpg", [b"UTF-8"]),
+            ("README.txt", [SHAPEFILE_README.encode("utf-8")]),
+        ])
+    finally:
+        db.close()
@@ -0,0 +1,81 @@
+"""
+Geographic helpers shared by the spatial queries
+Distances use a spherical earth (haversine), which is accurate to ~0.5%
+and needs no PostGIS: candidates come from the GiST index on
+point(lon, lat) (a bounding box, or <-> ordering for nearest neighbours)
+and are then measured exactly.
+"""
+
+import math
+from typing import Tuple
+from sqlalchemy import func
+from app.models.earthquake import Earthquake
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180.0
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM  # half the circumference
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two points in kilometres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_expression(lat: float, lon: float):
+    """
+    SQL expression for the distance in km from (lat, lon) to each earthquake
+    """
+    dphi = func.radians(Earthquake.lat - lat)
+    dlambda = func.radians(Earthquake.lon - lon)
+    a = (
+        func.power(func.sin(dphi / 2), 2)
+        + math.cos(math.radians(lat)) * func.cos(func.radians(Earthquake.lat))
+        * func.power(func.sin(dlambda / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Smallest lat/lon box containing the circle of radius_km around (lat, lon)
+    Returns: (min_lat, max_lat, min_lon, max_lon); longitude spans the whole
+    range when the circle reaches a pole or crosses the antimeridian
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    
+    dlon = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def event_point():
+    """
+    point(lon, lat) of each earthquake, the expression of ix_earthquakes_point
+    """
+    return func.point(Earthquake.lon, Earthquake.lat)
+
+
+def within_box(min_lat: float, max_lat: float, min_lon: float, max_lon: float):
+    """
+    Condition for events inside a lat/lon box, served by ix_earthquakes_point
+    """
+    return event_point().op("<@")(func.box(func.point(min_lon, min_lat), func.point(max_lon, max_lat)))
+
+
+def planar_distance(lat: float, lon: float):
+    """
+    Euclidean distance in degrees from (lat, lon); ORDER BY it walks
+    ix_earthquakes_point nearest first (k-NN)
+    """
+    return event_point().op("<->")(func.point(lon, lat))
@@ -0,0 +1,152 @@
+"""
+Lat/lon grid aggregation for the map heatmap
+Events are binned into square cells of cell_size degrees aligned on
+(-90, -180). Each cell reports the event count, the maximum magnitude and
+the radiated energy sum, log10 E[J] = 1.5 M + 4.8 (Gutenberg-Richter).
+
+Unfiltered grids at PRECOMPUTED_CELL_SIZES are computed once per data
+version (eagerly after each sync, see refresh_precomputed); any other
+resolution or filter set is binned on demand from the in-memory catalog.
+"""
+
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.services.analytics_service import Catalog, get_catalog, select_events
+from app.services.data_version import get_data_version
+
+PRECOMPUTED_CELL_SIZES = (2.0, 1.0, 0.5, 0.25)
+
+
+class Grid(NamedTuple):
+    row: np.ndarray  # latitude index of the cell
+    col: np.ndarray  # longitude index of the cell
+    count: np.ndarray
+    max_magnitude: np.ndarray
+    energy: np.ndarray
+
+
+_lock = threading.Lock()
+_grids: Dict[float, Grid] = {}
+_grids_version: Optional[int] = None
+
+
+def energy_joules(magnitudes: np.ndarray) -> np.ndarray:
+    return np.power(10.0, 1.5 * magnitudes + 4.8)
+
+
+def build_grid(catalog: Catalog, mask: np.ndarray, cell_size: float) -> Grid:
+    """
+    Aggregate the masked events with coordinates into cells
+    """
+    mask = mask & ~np.isnan(catalog.lat) & ~np.isnan(catalog.lon)
+    lat, lon, magnitude = catalog.lat[mask], catalog.lon[mask], catalog.magnitude[mask]
+
+    n_cols = int(np.ceil(360.0 / cell_size)) + 1
+    row = np.floor((lat + 90.0) / cell_size).astype(np.int64)
+    col = np.floor((lon + 180.0) / cell_size).astype(np.int64)
+    keys, inverse = np.unique(row * n_cols + col, return_inverse=True)
+
+    count = np.bincount(inverse, minlength=keys.size)
+    has_magnitude = ~np.isnan(magnitude)
+    energy = np.bincount(
+        inverse, weights=np.where(has_magnitude, energy_joules(np.nan_to_num(magnitude)), 0.0), minlength=keys.size
+    )
+    max_magnitude = np.full(keys.size, -np.inf)
+    np.maximum.at(max_magnitude, inverse[has_magnitude], magnitude[has_magnitude])
+
+    return Grid(keys // n_cols, keys % n_cols, count, max_magnitude, energy)
+
+
+def refresh_precomputed() -> int:
+    """
+    Rebuild the precomputed grids for the current data version
+    Returns: the data version the grids were built for
+    """
+    global _grids, _grids_version
+    version = get_data_version()
+    with _lock:
+        if _grids_version != version:
+            catalog = get_catalog()
+            everything = np.ones(len(catalog.magnitude), dtype=bool)
+            _grids = {size: build_grid(catalog, everything, size) for size in PRECOMPUTED_CELL_SIZES}
+            _grids_version = version
+    return version
+
+
+def _viewport(grid: Grid, cell_size: float, from_latitude, to_latitude, from_longitude, to_longitude) -> np.ndarray:
+    # Cells intersecting the viewport, so partial cells at the edges keep their full totals
+    lat_low = grid.row * cell_size - 90.0
+    lon_low = grid.col * cell_size - 180.0
+    keep = np.ones(grid.count.size, dtype=bool)
+    if from_latitude is not None:
+        keep &= lat_low + cell_size > from_latitude
+    if to_latitude is not None:
+        keep &= lat_low <= to_latitude
+    if from_longitude is not None:
+        keep &= lon_low + cell_size > from_longitude
+    if to_longitude is not None:
+        keep &= lon_low <= to_longitude
+    return keep
+
+
+class HeatmapService:
+    @staticmethod
+    def get_heatmap(
+        cell_size: float = 1.0,
+        from_magnitude: Optional[float] = None,
+        to_magnitude: Optional[float] = None,
+        from_latitude: Optional[float] = None,
+        to_latitude: Optional[float] = None,
+        from_longitude: Optional[float] = None,
+        to_longitude: Optional[float] = None,
+        **filters
+    ) -> Dict[str, Any]:
+        """
+        Grid cells with count, max magnitude and energy sum
+        The from_/to_latitude and from_/to_longitude viewport selects the
+        cells intersecting it; the other filters select events.
+        Returns: {"cell_size", "precomputed", "cells": [{"lat", "lon", "count", "max_magnitude", "energy"}]}
+        where lat/lon is the cell centre
+        """
+        event_filters = {key: value for key, value in filters.items() if value is not None}
+        precomputed = (
+            cell_size in PRECOMPUTED_CELL_SIZES
+            and not event_filters
+            and from_magnitude is None
+            and to_magnitude is None
+        )
+
+        if precomputed:
+            refresh_precomputed()
+            grid = _grids[cell_size]
+        else:
+            catalog = get_catalog()
+            mask = select_events(catalog, **event_filters)
+            if from_magnitude is not None:
+                mask &= catalog.magnitude >= from_magnitude
+            if to_magnitude is not None:
+                mask &= catalog.magnitude <= to_magnitude
+            grid = build_grid(catalog, mask, cell_size)
+
+        keep = _viewport(grid, cell_size, from_latitude, to_latitude, from_longitude, to_longitude)
+        lat = (grid.row[keep] + 0.5) * cell_size - 90.0
+        lon = (grid.col[keep] + 0.5) * cell_size - 180.0
+        max_magnitude = grid.max_magnitude[keep]
+
+        cells: List[Dict[str, Any]] = [
+            {
+                "lat": round(cell_lat, 6),
+                "lon": round(cell_lon, 6),
+                "count": count,
+                "max_magnitude": None if magnitude == -np.inf else magnitude,
+                "energy": energy,
+            }
+            for cell_lat, cell_lon, count, magnitude, energy in zip(
+                lat.tolist(), lon.tolist(), grid.count[keep].tolist(),
+                max_magnitude.tolist(), grid.energy[keep].tolist()
+            )
+        ]
+        return {"cell_size": cell_size, "precomputed": precomputed, "cells": cells}
@@ -0,0 +1,104 @@
+"""
+Minimal Mapbox Vector Tile encoder for point layers
+Implements the parts of the vector tile spec 2.1 protobuf schema that a
+point layer needs (Tile.layers, Layer, Feature, Value), so no protobuf
+dependency is required.
+"""
+
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_EXTENT = 4096
+GEOM_POINT = 1
+COMMAND_MOVE_TO = 1
+
+# (id, x, y, properties) with x/y in tile coordinates (0..extent)
+Feature = Tuple[Optional[int], int, int, Dict[str, Any]]
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _varint_field(field: int, value: int) -> bytes:
+    return _key(field, 0) + _varint(value)
+
+
+def _bytes_field(field: int, data: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(data)) + data
+
+
+def _packed_field(field: int, values: Iterable[int]) -> bytes:
+    return _bytes_field(field, b"".join(_varint(value) for value in values))
+
+
+def _value(value: Any) -> bytes:
+    if isinstance(value, bool):
+        return _varint_field(7, int(value))
+    if isinstance(value, int):
+        return _varint_field(6, _zigzag(value)) if value < 0 else _varint_field(5, value)
+    if isinstance(value, float):
+        return _key(3, 1) + struct.pack("<d", value)
+    return _bytes_field(1, str(value).encode("utf-8"))
+
+
+def encode_layer(name: str, features: Iterable[Feature], extent: int = DEFAULT_EXTENT) -> bytes:
+    """
+    One Layer message of point features; None properties are left out
+    """
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    encoded_features: List[bytes] = []
+
+    for feature_id, x, y, properties in features:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+
+        geometry = (_varint((COMMAND_MOVE_TO & 0x7) | (1 << 3)), _varint(_zigzag(x)), _varint(_zigzag(y)))
+        message = b""
+        if feature_id is not None:
+            message += _varint_field(1, feature_id)
+        if tags:
+            message += _packed_field(2, tags)
+        message += _varint_field(3, GEOM_POINT)
+        message += _bytes_field(4, b"".join(geometry))
+        encoded_features.append(_bytes_field(2, message))
+
+    layer = _varint_field(15, 2) + _bytes_field(1, name.encode("utf-8"))
+    layer += b"".join(encoded_features)
+    layer += b"".join(_bytes_field(3, key.encode("utf-8")) for key in keys)
+    layer += b"".join(_bytes_field(4, _value(value)) for _, value in values)
+    layer += _varint_field(5, extent)
+    return layer
+
+
+def encode_tile(layers: Dict[str, Iterable[Feature]], extent: int = DEFAULT_EXTENT) -> bytes:
+    """
+    Tile message with one point layer per entry; empty layers are omitted
+    """
+    tile = b""
+    for name, features in layers.items():
+        features = list(features)
+        if features:
+            tile += _bytes_field(3, encode_layer(name, features, extent))
+    return tile
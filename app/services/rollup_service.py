@@ -0,0 +1,152 @@
+"""
+Monthly rollup maintenance
+The statistics endpoints read earthquake_monthly_stats, which costs
+O(months) instead of a GROUP BY over every earthquake. Each write
+recomputes the months it touched from the earthquakes table (an index
+range scan on event_time) inside the writer's own transaction.
+
+Concurrent writers serialize per month on a transaction-level advisory
+lock taken before the month is recomputed: the second writer waits for the
+first to commit, and its recompute then sees both writers' rows.
+"""
+
+from sqlalchemy import func, select, delete, literal, exists, and_, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.earthquake import Earthquake
+from app.models.monthly_stats import EarthquakeMonthlyStats
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+Month = Tuple[int, int]
+
+AGGREGATE_COLUMNS = (
+    "count",
+    "max_magnitude",
+    "min_magnitude",
+    "sum_magnitude",
+    "magnitude_count",
+    "max_depth",
+    "min_depth",
+    "sum_depth",
+    "depth_count",
+    "updated_at",
+)
+
+
+def month_of(event_time: Optional[datetime]) -> Optional[Month]:
+    if event_time is None:
+        return None
+    return event_time.year, event_time.month
+
+
+def month_range(month: Month) -> Tuple[datetime, datetime]:
+    year, month_number = month
+    start = datetime(year, month_number, 1)
+    end = datetime(year + 1, 1, 1) if month_number == 12 else datetime(year, month_number + 1, 1)
+    return start, end
+
+
+def _aggregates():
+    return [
+        func.count(Earthquake.id),
+        func.max(Earthquake.magnitude),
+        func.min(Earthquake.magnitude),
+        func.sum(Earthquake.magnitude),
+        func.count(Earthquake.magnitude),
+        func.max(Earthquake.depth_km),
+        func.min(Earthquake.depth_km),
+        func.sum(Earthquake.depth_km),
+        func.count(Earthquake.depth_km),
+        func.now(),
+    ]
+
+
+class RollupService:
+    @staticmethod
+    def refresh_statements(months: Iterable[Optional[Month]]) -> list:
+        """
+        Statements that recompute the given months from the earthquakes table
+        Upserts months that have events and deletes months that became empty,
+        each after taking the month's advisory lock (in month order, so
+        writers cannot deadlock on each other)
+        """
+        statements = []
+        for month in sorted({m for m in months if m is not None}):
+            year, month_number = month
+            start, end = month_range(month)
+            statements.append(select(func.pg_advisory_xact_lock(year * 100 + month_number)))
+            in_month = and_(Earthquake.event_time >= start, Earthquake.event_time < end)
+            
+            source = select(literal(year), literal(month_number), *_aggregates()).where(in_month).having(
+                func.count(Earthquake.id) > 0
+            )
+            upsert = insert(EarthquakeMonthlyStats).from_select(
+                ["year", "month", *AGGREGATE_COLUMNS], source
+            )
+            upsert = upsert.on_conflict_do_update(
+                index_elements=["year", "month"],
+                set_={name: getattr(upsert.excluded, name) for name in AGGREGATE_COLUMNS}
+            )
+            statements.append(upsert)
+            statements.append(
+                delete(EarthquakeMonthlyStats).where(
+                    EarthquakeMonthlyStats.year == year,
+                    EarthquakeMonthlyStats.month == month_number,
+                    ~exists().where(in_month)
+                )
+            )
+        return statements
+
+    @staticmethod
+    def refresh_months(db: Session, months: Iterable[Optional[Month]]):
+        """
+        Recompute months inside the caller's transaction (caller commits)
+        """
+        for stmt in RollupService.refresh_statements(months):
+            db.execute(stmt)
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        Recompute the whole rollup table from scratch and commit
+        Returns: number of months written
+        """
+        year_expr = func.extract("year", Earthquake.event_time).cast(EarthquakeMonthlyStats.year.type)
+        month_expr = func.extract("month", Earthquake.event_time).cast(EarthquakeMonthlyStats.month.type)
+        source = select(year_expr, month_expr, *_aggregates()).where(
+            Earthquake.event_time.isnot(None)
+        ).group_by(year_expr, month_expr)
+        
+        # Waits for writers that already refreshed a month, and holds off new
+        # ones until the rebuilt table is committed
+        db.execute(text(f"LOCK TABLE {EarthquakeMonthlyStats.__tablename__} IN EXCLUSIVE MODE"))
+        db.execute(delete(EarthquakeMonthlyStats))
+        db.execute(insert(EarthquakeMonthlyStats).from_select(["year", "month", *AGGREGATE_COLUMNS], source))
+        db.commit()
+        return db.query(func.count()).select_from(EarthquakeMonthlyStats).scalar()
+
+    @staticmethod
+    def ensure_built(db: Session) -> bool:
+        """
+        Build the rollup on first start (empty rollup, non-empty catalog)
+        Returns True if a rebuild was run
+        """
+        has_rollup = db.query(exists().where(EarthquakeMonthlyStats.year.isnot(None))).scalar()
+        has_events = db.query(exists().where(Earthquake.event_time.isnot(None))).scalar()
+        if has_events and not has_rollup:
+            RollupService.rebuild(db)
+            return True
+        return False
+
+    @staticmethod
+    def get_months(db: Session, from_year: Optional[int] = None, to_year: Optional[int] = None) -> List[EarthquakeMonthlyStats]:
+        """
+        Rollup rows in a year range, ordered by year and month
+        """
+        query = db.query(EarthquakeMonthlyStats)
+        if from_year is not None:
+            query = query.filter(EarthquakeMonthlyStats.year >= from_year)
+        if to_year is not None:
+            query = query.filter(EarthquakeMonthlyStats.year <= to_year)
+        return query.order_by(EarthquakeMonthlyStats.year.asc(), EarthquakeMonthlyStats.month.asc()).all()
@@ -0,0 +1,122 @@
+"""
+Minimal ESRI Shapefile writer for point layers
+Writes the .shp/.shx/.dbf/.prj/.cpg members as byte chunks so they can be
+streamed into a ZIP. The headers carry the record count, file lengths and
+bounding box, so those have to be known before the first record is
+written; the caller passes them in from a pre-query.
+
+Reference: ESRI Shapefile Technical Description (1998) and the dBASE III
+table format. Text fields are stored as UTF-8, declared in the .cpg file.
+"""
+
+import struct
+from datetime import date
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+SHAPE_TYPE_POINT = 1
+SHP_HEADER_BYTES = 100
+POINT_CONTENT_BYTES = 20  # shape type + x + y
+POINT_RECORD_BYTES = 8 + POINT_CONTENT_BYTES
+
+WGS84_PRJ = (
+    'GEOGCS["GCS_WGS_1984",DATUM["D_WGS_1984",SPHEROID["WGS_1984",6378137.0,298.257223563]],'
+    'PRIMEM["Greenwich",0.0],UNIT["Degree",0.0174532925199433]]'
+)
+
+BBox = Tuple[float, float, float, float]  # (xmin, ymin, xmax, ymax)
+
+
+class DbfField(NamedTuple):
+    name: str  # at most 10 characters
+    type: str  # C (text), N (number) or L (logical)
+    length: int
+    decimals: int = 0
+
+
+def _main_header(file_length_bytes: int, bbox: BBox) -> bytes:
+    xmin, ymin, xmax, ymax = bbox
+    return (
+        struct.pack(">i5i", 9994, 0, 0, 0, 0, 0)
+        + struct.pack(">i", file_length_bytes // 2)  # in 16-bit words
+        + struct.pack("<ii", 1000, SHAPE_TYPE_POINT)
+        + struct.pack("<8d", xmin, ymin, xmax, ymax, 0.0, 0.0, 0.0, 0.0)
+    )
+
+
+def shp_header(count: int, bbox: BBox) -> bytes:
+    return _main_header(SHP_HEADER_BYTES + count * POINT_RECORD_BYTES, bbox)
+
+
+def shp_records(points: Iterable[Tuple[float, float]], first_number: int = 1) -> bytes:
+    """
+    Point records (x = longitude, y = latitude) numbered from first_number
+    """
+    content_words = POINT_CONTENT_BYTES // 2
+    return b"".join(
+        struct.pack(">ii", number, content_words) + struct.pack("<idd", SHAPE_TYPE_POINT, x, y)
+        for number, (x, y) in enumerate(points, first_number)
+    )
+
+
+def iter_shx(count: int, bbox: BBox, chunk_size: int = 10000) -> Iterator[bytes]:
+    """
+    The index only depends on the record count, since every point record
+    has the same size
+    """
+    yield _main_header(SHP_HEADER_BYTES + count * 8, bbox)
+    content_words = POINT_CONTENT_BYTES // 2
+    for start in range(0, count, chunk_size):
+        yield b"".join(
+            struct.pack(">ii", (SHP_HEADER_BYTES + index * POINT_RECORD_BYTES) // 2, content_words)
+            for index in range(start, min(start + chunk_size, count))
+        )
+
+
+def dbf_header(fields: Sequence[DbfField], count: int, today: Optional[date] = None) -> bytes:
+    today = today or date.today()
+    header_length = 32 + 32 * len(fields) + 1
+    record_length = 1 + sum(field.length for field in fields)
+    header = struct.pack(
+        "<BBBBIHH20x", 0x03, today.year - 1900, today.month, today.day, count, header_length, record_length
+    )
+    descriptors = b"".join(
+        struct.pack(
+            "<11sc4xBB14x",
+            field.name.encode("ascii")[:10],
+            field.type.encode("ascii"),
+            field.length,
+            field.decimals,
+        )
+        for field in fields
+    )
+    return header + descriptors + b"\r"
+
+
+def _dbf_value(field: DbfField, value: Any) -> bytes:
+    if field.type == "L":
+        return b"?" if value is None else (b"T" if value else b"F")
+
+    if field.type == "N":
+        if value is None:
+            return b" " * field.length
+        text = f"{value:{field.length}.{field.decimals}f}" if field.decimals else f"{int(value):{field.length}d}"
+        # A value that does not fit is stored as null rather than truncated
+        return text.encode("ascii") if len(text) == field.length else b" " * field.length
+
+    encoded = ("" if value is None else str(value)).encode("utf-8")
+    if len(encoded) > field.length:
+        encoded = encoded[:field.length].decode("utf-8", "ignore").encode("utf-8")
+    return encoded.ljust(field.length, b" ")
+
+
+def dbf_records(fields: Sequence[DbfField], rows: Iterable[Sequence[Any]]) -> bytes:
+    """
+    Fixed-width records for rows of values in field order
+    """
+    return b"".join(
+        b" " + b"".join(_dbf_value(field, value) for field, value in zip(fields, row))
+        for row in rows
+    )
+
+
+DBF_END = b"\x1a"
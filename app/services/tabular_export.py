@@ -0,0 +1,129 @@
+"""
+Tabular exports: CSV, Parquet and Arrow IPC stream
+Rows come from a server-side cursor in batches of TABULAR_CHUNK_SIZE;
+each batch becomes one CSV block, one Parquet row group or one Arrow
+record batch, so memory is bounded by a single batch.
+"""
+
+import csv
+import io
+from typing import Any, Dict, Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+
+from app.models.earthquake import Earthquake
+from app.services.earthquake_service import EarthquakeService
+from app.services.export_service import ChunkBuffer, ProgressCallback, iter_row_chunks
+
+TABULAR_CHUNK_SIZE = 50000
+
+TABULAR_COLUMNS = (
+    Earthquake.id,
+    Earthquake.earthquake_id,
+    Earthquake.event_time,
+    Earthquake.date,
+    Earthquake.time,
+    Earthquake.lat,
+    Earthquake.lon,
+    Earthquake.depth_km,
+    Earthquake.magnitude,
+    Earthquake.magnitude_type,
+    Earthquake.epicenter,
+    Earthquake.epicenter_ru,
+    Earthquake.epicenter_en,
+    Earthquake.color,
+    Earthquake.is_perceptabily,
+)
+
+
+def arrow_schema():
+    return pa.schema([
+        ("id", pa.int64()),
+        ("earthquake_id", pa.int64()),
+        ("event_time", pa.timestamp("us")),
+        ("date", pa.string()),
+        ("time", pa.string()),
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+        ("depth_km", pa.float64()),
+        ("magnitude", pa.float64()),
+        ("magnitude_type", pa.string()),
+        ("epicenter", pa.string()),
+        ("epicenter_ru", pa.string()),
+        ("epicenter_en", pa.string()),
+        ("color", pa.string()),
+        ("is_perceptabily", pa.bool_()),
+    ])
+
+
+def tabular_statement(filters: Optional[Dict[str, Any]] = None):
+    """
+    Every (matching) earthquake, in id order
+    """
+    stmt = select(*TABULAR_COLUMNS)
+    if filters:
+        stmt = EarthquakeService._apply_filters(stmt, **filters)
+    return stmt.order_by(Earthquake.id)
+
+
+def _chunks(filters, on_rows):
+    return iter_row_chunks(tabular_statement(filters), chunk_size=TABULAR_CHUNK_SIZE, on_rows=on_rows)
+
+
+def _csv_row(row) -> tuple:
+    values = list(row)
+    if row.event_time is not None:
+        values[2] = row.event_time.isoformat()
+    return values
+
+
+def iter_csv(filters: Optional[Dict[str, Any]] = None, on_rows: Optional[ProgressCallback] = None) -> Iterator[bytes]:
+    """
+    UTF-8 CSV with a header row; event_time in ISO 8601, empty cells for NULL
+    """
+    text = io.StringIO()
+    writer = csv.writer(text, lineterminator="\n")
+    writer.writerow([column.key for column in TABULAR_COLUMNS])
+    for rows in _chunks(filters, on_rows):
+        writer.writerows(_csv_row(row) for row in rows)
+        yield text.getvalue().encode("utf-8")
+        text.seek(0)
+        text.truncate()
+    yield text.getvalue().encode("utf-8")
+
+
+def _record_batch(schema, rows):
+    columns = list(zip(*rows))
+    return pa.record_batch(
+        [pa.array(values, type=field.type) for field, values in zip(schema, columns)],
+        schema=schema
+    )
+
+
+def _iter_arrow(open_writer, filters, on_rows) -> Iterator[bytes]:
+    schema = arrow_schema()
+    buffer = ChunkBuffer()
+    writer = open_writer(pa.PythonFile(buffer, mode="w"), schema)
+    for rows in _chunks(filters, on_rows):
+        writer.write_batch(_record_batch(schema, rows))
+        data = buffer.drain()
+        if data:
+            yield data
+    writer.close()
+    yield buffer.drain()
+
+
+def iter_parquet(filters: Optional[Dict[str, Any]] = None, on_rows: Optional[ProgressCallback] = None) -> Iterator[bytes]:
+    """
+    Parquet file with one row group per batch
+    """
+    return _iter_arrow(lambda sink, schema: pq.ParquetWriter(sink, schema, compression="zstd"), filters, on_rows)
+
+
+def iter_arrow_stream(filters: Optional[Dict[str, Any]] = None, on_rows: Optional[ProgressCallback] = None) -> Iterator[bytes]:
+    """
+    Arrow IPC stream with one record batch per batch
+    """
+    return _iter_arrow(pa.ipc.new_stream, filters, on_rows)
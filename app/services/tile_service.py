@@ -0,0 +1,146 @@
+"""
+Vector tiles of the catalog (Web Mercator, z/x/y)
+Events are selected from the in-memory NumPy catalog (see
+analytics_service), projected into tile coordinates and encoded as MVT.
+Below CLUSTER_MAX_ZOOM nearby events are merged into clusters on a
+CLUSTER_GRID x CLUSTER_GRID grid per tile, so low zoom tiles stay small.
+
+Encoded tiles are kept in an LRU cache keyed by data version; any write
+makes the cached tiles unreachable and they age out.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.services.analytics_service import get_catalog
+from app.services.data_version import get_data_version
+from app.services.mvt import DEFAULT_EXTENT, encode_tile
+
+MAX_ZOOM = 22
+CLUSTER_MAX_ZOOM = 8
+CLUSTER_GRID = 64
+TILE_BUFFER = 64  # tile units around the tile, so symbols at edges are not cut
+TILE_CACHE_MAX_ENTRIES = 4096
+MAX_LATITUDE = 85.0511287798
+LAYER_NAME = "earthquakes"
+
+_lock = threading.Lock()
+_tile_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """
+    (min_lon, min_lat, max_lon, max_lat) of a tile
+    """
+    n = 2 ** z
+
+    def lat(tile_y: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def project(lat: np.ndarray, lon: np.ndarray, z: int, x: int, y: int, extent: int = DEFAULT_EXTENT):
+    """
+    Web Mercator tile coordinates (0..extent inside the tile) of lat/lon arrays
+    """
+    n = 2 ** z
+    phi = np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE))
+    world_x = (lon + 180.0) / 360.0 * n
+    world_y = (1.0 - np.log(np.tan(phi) + 1.0 / np.cos(phi)) / math.pi) / 2.0 * n
+    return (
+        np.round((world_x - x) * extent).astype(np.int64),
+        np.round((world_y - y) * extent).astype(np.int64),
+    )
+
+
+def _features(z: int, x: int, y: int):
+    catalog = get_catalog()
+    margin = TILE_BUFFER / DEFAULT_EXTENT
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+    pad_lon = (max_lon - min_lon) * margin
+    pad_lat = (max_lat - min_lat) * margin
+
+    mask = (
+        (catalog.lat >= min_lat - pad_lat) & (catalog.lat <= max_lat + pad_lat)
+        & (catalog.lon >= min_lon - pad_lon) & (catalog.lon <= max_lon + pad_lon)
+    )
+    ids = catalog.id[mask]
+    magnitude = catalog.magnitude[mask]
+    depth = catalog.depth_km[mask]
+    event_time = catalog.event_time[mask]
+    tile_x, tile_y = project(catalog.lat[mask], catalog.lon[mask], z, x, y)
+
+    if z < CLUSTER_MAX_ZOOM:
+        return _clusters(tile_x, tile_y, magnitude)
+
+    # Largest events last, so they are drawn on top
+    order = np.argsort(np.nan_to_num(magnitude, nan=-np.inf), kind="stable")
+    return [
+        (
+            int(ids[i]),
+            int(tile_x[i]),
+            int(tile_y[i]),
+            {
+                "magnitude": None if np.isnan(magnitude[i]) else float(magnitude[i]),
+                "depth_km": None if np.isnan(depth[i]) else float(depth[i]),
+                "event_time": None if np.isnat(event_time[i]) else str(event_time[i]),
+            },
+        )
+        for i in order
+    ]
+
+
+def _clusters(tile_x: np.ndarray, tile_y: np.ndarray, magnitude: np.ndarray):
+    if tile_x.size == 0:
+        return []
+    cell = DEFAULT_EXTENT // CLUSTER_GRID
+    # Shift by the buffer so buffered points get cells of their own
+    row = np.clip((tile_y + TILE_BUFFER) // cell, 0, CLUSTER_GRID + 3)
+    col = np.clip((tile_x + TILE_BUFFER) // cell, 0, CLUSTER_GRID + 3)
+    keys = row * (CLUSTER_GRID + 4) + col
+    _, inverse = np.unique(keys, return_inverse=True)
+    count = np.bincount(inverse)
+    center_x = np.bincount(inverse, weights=tile_x) / count
+    center_y = np.bincount(inverse, weights=tile_y) / count
+    has_magnitude = ~np.isnan(magnitude)
+    max_magnitude = np.full(count.size, -np.inf)
+    np.maximum.at(max_magnitude, inverse[has_magnitude], magnitude[has_magnitude])
+
+    return [
+        (
+            None,
+            int(round(cx)),
+            int(round(cy)),
+            {"point_count": int(n), "max_magnitude": None if m == -np.inf else float(m)},
+        )
+        for cx, cy, n, m in zip(center_x.tolist(), center_y.tolist(), count.tolist(), max_magnitude.tolist())
+    ]
+
+
+class TileService:
+    @staticmethod
+    def get_tile(z: int, x: int, y: int) -> bytes:
+        """
+        Encoded MVT tile with one "earthquakes" layer
+        Features below CLUSTER_MAX_ZOOM carry point_count and max_magnitude,
+        above it id, magnitude, depth_km and event_time
+        """
+        key = (get_data_version(), z, x, y)
+        with _lock:
+            tile: Optional[bytes] = _tile_cache.get(key)
+            if tile is not None:
+                _tile_cache.move_to_end(key)
+                return tile
+
+        tile = encode_tile({LAYER_NAME: _features(z, x, y)})
+
+        with _lock:
+            _tile_cache[key] = tile
+            while len(_tile_cache) > TILE_CACHE_MAX_ENTRIES:
+                _tile_cache.popitem(last=False)
+        return tile
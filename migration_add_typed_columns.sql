@@ -0,0 +1,44 @@
+-- Migration: Add typed event_time / lat / lon / depth_km columns
+-- The string columns (date, time, latitude, longitude, depth) are kept as-is.
+-- These typed copies are what filters, sorting and statistics now use, so
+-- date and magnitude range queries become index range scans.
+
+-- Step 1: Add the columns
+ALTER TABLE earthquakes ADD COLUMN IF NOT EXISTS event_time TIMESTAMP WITHOUT TIME ZONE;
+ALTER TABLE earthquakes ADD COLUMN IF NOT EXISTS lat DOUBLE PRECISION;
+ALTER TABLE earthquakes ADD COLUMN IF NOT EXISTS lon DOUBLE PRECISION;
+ALTER TABLE earthquakes ADD COLUMN IF NOT EXISTS depth_km DOUBLE PRECISION;
+
+-- Step 2: Backfill from the string columns
+-- Dates from the external API are DD.MM.YYYY, manually created ones YYYY.MM.DD
+UPDATE earthquakes SET event_time = (
+    CASE
+        WHEN trim(date) ~ '^\d{2}\.\d{2}\.\d{4}$' THEN to_date(trim(date), 'DD.MM.YYYY')
+        WHEN trim(date) ~ '^\d{4}[.\-/]\d{2}[.\-/]\d{2}$' THEN to_date(translate(trim(date), './', '--'), 'YYYY-MM-DD')
+        WHEN trim(date) ~ '^\d{2}-\d{2}-\d{4}$' THEN to_date(trim(date), 'DD-MM-YYYY')
+    END
+) + (
+    CASE
+        WHEN trim(time) ~ '^\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?$' THEN trim(time)::time
+        ELSE '00:00'::time
+    END
+);
+
+UPDATE earthquakes SET
+    lat = CASE WHEN replace(trim(latitude), ',', '.') ~ '^-?\d+(\.\d+)?$' THEN replace(trim(latitude), ',', '.')::double precision END,
+    lon = CASE WHEN replace(trim(longitude), ',', '.') ~ '^-?\d+(\.\d+)?$' THEN replace(trim(longitude), ',', '.')::double precision END,
+    depth_km = CASE WHEN replace(trim(depth), ',', '.') ~ '^-?\d+(\.\d+)?$' THEN replace(trim(depth), ',', '.')::double precision END;
+
+-- Step 3: Indexes
+CREATE INDEX IF NOT EXISTS ix_earthquakes_event_time_id ON earthquakes (event_time, id);
+CREATE INDEX IF NOT EXISTS ix_earthquakes_event_time_desc_id ON earthquakes (event_time DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS ix_earthquakes_magnitude_event_time ON earthquakes (magnitude, event_time);
+CREATE INDEX IF NOT EXISTS ix_earthquakes_lat_lon ON earthquakes (lat, lon);
+CREATE INDEX IF NOT EXISTS ix_earthquakes_depth_km ON earthquakes (depth_km);
+
+ANALYZE earthquakes;
+
+-- Step 4: Verify the backfill
+-- SELECT count(*) FILTER (WHERE event_time IS NULL) AS unparsed_dates,
+--        count(*) FILTER (WHERE lat IS NULL OR lon IS NULL) AS unparsed_coordinates
+-- FROM earthquakes;
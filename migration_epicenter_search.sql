@@ -0,0 +1,13 @@
+-- Migration: Trigram indexes for epicenter search
+-- Lets ILIKE '%term%' / 'term%' and similarity ranking over the uz/ru/en
+-- epicenter columns use GIN indexes instead of scanning the whole table.
+
+-- Step 1: Enable the extension (needs a role allowed to create extensions)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Step 2: Indexes
+CREATE INDEX IF NOT EXISTS ix_earthquakes_epicenter_trgm ON earthquakes USING gin (epicenter gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_earthquakes_epicenter_ru_trgm ON earthquakes USING gin (epicenter_ru gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_earthquakes_epicenter_en_trgm ON earthquakes USING gin (epicenter_en gin_trgm_ops);
+
+ANALYZE earthquakes;
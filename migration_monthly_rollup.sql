@@ -0,0 +1,37 @@
+-- Migration: Monthly statistics rollup
+-- The statistics endpoints read this table instead of grouping the whole
+-- earthquakes table. The API creates it on startup and fills it when it is
+-- empty; this script does the same by hand. Requires migration_add_typed_columns.sql.
+
+-- Step 1: Create the table
+CREATE TABLE IF NOT EXISTS earthquake_monthly_stats (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    max_magnitude DOUBLE PRECISION,
+    min_magnitude DOUBLE PRECISION,
+    sum_magnitude DOUBLE PRECISION,
+    magnitude_count INTEGER NOT NULL DEFAULT 0,
+    max_depth DOUBLE PRECISION,
+    min_depth DOUBLE PRECISION,
+    sum_depth DOUBLE PRECISION,
+    depth_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (year, month)
+);
+
+-- Step 2: Fill it (same as: python -m app.rebuild_rollup)
+BEGIN;
+DELETE FROM earthquake_monthly_stats;
+INSERT INTO earthquake_monthly_stats
+SELECT
+    extract(year FROM event_time)::int,
+    extract(month FROM event_time)::int,
+    count(id),
+    max(magnitude), min(magnitude), sum(magnitude), count(magnitude),
+    max(depth_km), min(depth_km), sum(depth_km), count(depth_km),
+    now()
+FROM earthquakes
+WHERE event_time IS NOT NULL
+GROUP BY 1, 2;
+COMMIT;
@@ -0,0 +1,8 @@
+-- Migration: GiST index on point(lon, lat) for /earthquakes/near
+-- Core PostgreSQL geometric types, no PostGIS needed. Serves the bounding
+-- box of radius searches (<@ box) and index-ordered nearest neighbour
+-- search (ORDER BY point(lon, lat) <-> point(:lon, :lat)).
+
+CREATE INDEX IF NOT EXISTS ix_earthquakes_point ON earthquakes USING gist (point(lon, lat));
+
+ANALYZE earthquakes;